@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""
+GloBUME: global building material use and embodied greenhouse gas emissions in 26 global regions between 2020-2060
+
+The model is organised in stages, each a function of a configuration (Config) returning arrays:
+    load_inputs(config)                             -> inputs
+    compute_floor_area(config, inputs)              -> floor area stock by building type, region & year
+    compute_stock(config, inputs, floor_area)       -> floor area inflow & outflow by cohort (dynamic stock model)
+    compute_materials(config, inputs, stock)        -> material inflow & outflow
+    compute_emissions(config, inputs, materials)    -> emissions of primary & secondary material production
+run(config) runs all stages & writes the csv output, see GloBUME.py for an example.
+monte_carlo.monte_carlo(config, draws) samples the lifetimes, material intensities & recovery/reuse rates (also: python -m GloBUME.monte_carlo --help),
+ensemble.ensemble(config, draws) reduces the draws to running statistics & quantiles without keeping them (python -m GloBUME.ensemble --help).
+derivatives.derivatives(config) returns the Jacobian blocks of the total emissions with respect to the lifetimes, intensities, rates & emission factors (forward mode).
+gsa.gsa(config) computes Morris elementary effects or Sobol indices of the total emissions (python -m GloBUME.gsa --help).
+run_incremental(config, previous) recomputes only the building types & regions whose inputs changed since a previous run.
+regression.fit_all(config) fits the Gompertz & ExpDec curves of the commercial floor area (python -m GloBUME.regression writes the parameter files).
+sweep.sweep(grid) runs a grid of scenarios on a pool of processes (also from the command line: python -m GloBUME.sweep --help).
+
+"""
+
+from .config import Config, regions, years, materials, buildings, building_names
+from .parameter import Parameter
+from .inputs import load_inputs
+from .floor_area import compute_floor_area
+from .stock import compute_stock, outflow_cohort_frame
+from .materials import compute_materials
+from .emissions import compute_emissions
+from .output import Output, material_output, emission_output, material_output_frame, write_material_output, emission_output_frame, write_emission_output
+from .model import run
+from .incremental import run_incremental
+
+# The end.
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Configuration of a GloBUME run
+
+The general constants (regions, years, materials & building types) and the Config class holding the settings of one scenario:
+the location of the input files, the flags for the sensitivity analysis, the backend of the dynamic stock model & the output files.
+
+"""
+
+import os
+
+# Set general constants
+regions = 26        #26 IMAGE regions
+res_building_types = 4  #4 residential building types: detached, semi-detached, appartments & high-rise
+area = 2            #2 areas: rural & urban
+inflation = 1.2423  # gdp/cap inflation correction between 2005 (IMAGE data) & 2016 (commercial calibration) according to https://www.bls.gov/data/inflation_calculator.htm
+
+first_year = 1721   # first year of the historic tail
+last_year = 2060    # last year of the IMAGE scenario data
+years = list(range(first_year, last_year + 1))  # 340 years
+
+# 7 materials: Steel, brick, Concrete, Wood, Copper, Aluminium, Glass (in the order of the output)
+materials = ['steel', 'brick', 'concrete', 'wood', 'copper', 'aluminium', 'glass']
+
+# 12 building types (4 residential types in 2 areas & 4 commercial types) in the order of the output, as (type, area)
+buildings = [('detached', 'rural'), ('semi-detached', 'rural'), ('appartments', 'rural'), ('high-rise', 'rural'),
+             ('detached', 'urban'), ('semi-detached', 'urban'), ('appartments', 'urban'), ('high-rise', 'urban'),
+             ('office', 'commercial'), ('retail', 'commercial'), ('hotels', 'commercial'), ('govern', 'commercial')]
+
+# short names of the building types, as used in the variable names of the model (e.g. m2_det_rur)
+building_names = ['det_rur', 'sem_rur', 'app_rur', 'hig_rur', 'det_urb', 'sem_urb', 'app_urb', 'hig_urb', 'office', 'retail', 'hotels', 'govern']
+
+# the folder containing the files_* input folders & the output_* folders (the GloBUME-main folder)
+default_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class Config(object):
+    """
+    Settings of one GloBUME scenario.
+    path is the GloBUME-main folder, input & output file names are relative to path.
+    The stage cache keeps one stock entry (inflow & outflow by cohort) of about 24 MB per building type, so the default stage_cache_size
+    of 2 GB holds fewer than 100 of them (the stocks of about 7 scenarios), raise it for larger sweeps.
+    """
+    def __init__(self, path = None, flag_alpha = 0, flag_ExpDec = 0, flag_Normal = 0, flag_Mean = 0, dsm_backend = 'numpy', input_cache = 'input_cache', stage_cache = None, stage_cache_size = 2 * 1024**3,
+                 recovery_rate = 'files_recovery_rate/recovery_rate.csv', reuse_rate = 'files_recovery_rate/reuse_rate.csv',
+                 emission_primary = 'files_emission_factor/GHG_primary_per_kg.csv', emission_secondary = 'files_emission_factor/GHG_secondary_per_kg.csv',
+                 material_output = 'output_material/material_output.csv', emission_output = 'output_emission/GHG_total.csv', output_format = 'csv', output_dtype = None):
+        self.path = default_path if path is None else path
+
+        # Flags for sensitivity analysis
+        self.flag_alpha = flag_alpha    # switch for the sensitivity analysis on alpha, if 1 the maximum alpha is 10% above the maximum found in the data
+        self.flag_ExpDec = flag_ExpDec  # switch to choose between Gompertz and Exponential Decay function for commercial floorspace demand (0 = Gompertz, 1 = Expdec)
+        self.flag_Normal = flag_Normal  # switch to choose between Weibull and Normal lifetime distributions (0 = Weibull, 1 = Normal)
+        self.flag_Mean = flag_Mean      # switch to choose between material intensity settings (0 = regular regional, 1 = mean, 2 = high, 3 = low, 4 = median)
+
+        # computational backend of the dynamic stock model
+        self.dsm_backend = dsm_backend  # 'numpy' or 'numba' (compiled year loop, falls back to 'numpy' if numba is not installed)
+
+        # folder of the binary cache of the input files (see input_cache.py), None = always parse the csv-files
+        self.input_cache = input_cache
+
+        # folder of the cache of the stage results (see stage_cache.py) & its maximum size (bytes), None = compute all stages
+        self.stage_cache = stage_cache
+        self.stage_cache_size = stage_cache_size
+
+        # recovery & reuse rates, emission factors (e.g. the CO2 instead of the GHG emission factors)
+        self.recovery_rate = recovery_rate
+        self.reuse_rate = reuse_rate
+        self.emission_primary = emission_primary
+        self.emission_secondary = emission_secondary
+
+        # output files (material_output = None: the material flows are not written, the emissions are computed from the arrays in memory)
+        self.material_output = material_output
+        self.emission_output = emission_output
+        self.output_format = output_format  # 'csv', 'csv.gz', 'parquet', 'hdf5' or 'netcdf', or a list of these (see output.py)
+        self.output_dtype = output_dtype    # float type of the output, e.g. 'float32', None = float64
+
+    @property
+    def file_addition(self):
+        """Addition to the file names of the material intensity files, according to flag_Mean."""
+        if self.flag_Mean == 0:
+            return ''
+        elif self.flag_Mean == 1:
+            return '_mean'
+        elif self.flag_Mean == 2:
+            return '_high'
+        elif self.flag_Mean == 3:
+            return '_low'
+        else:
+            return '_median'
+
+    def file(self, name):
+        """Full path of an input or output file, name is relative to the GloBUME-main folder."""
+        return os.path.join(self.path, name)
+
+# The end.
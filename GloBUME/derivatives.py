@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Derivatives of the total emissions with respect to the model inputs, in one forward pass (forward mode)
+
+The derivatives (tangents) are propagated together with the values through the stages:
+    stock      : the survival tables & the stock-driven model, including the negative inflow correction (DynamicStockModelBatch.compute_stock_driven_model_tangent)
+    materials  : the products of the floor area inflow & outflow by cohort with the material intensities
+    emissions  : the recovery & reuse (MIN() of the inflow & the available outflow) & the emission factors (emissions.compute_emissions_tangent)
+The total emissions of a region only depend on the parameters of the same region, and the lifetimes of a building type only affect the flows of that
+building type, so the derivatives with respect to all parameters of a kind are propagated at once (one tangent per parameter, stored in the array
+of the flows it affects). The results are Jacobian blocks d emission_total[region, year] / d parameter[..., region]:
+    lifetime_shape, lifetime_scale                                     : building type x region x year
+    material_intensity, recovery_rate, reuse_rate,
+    emission_primary_per_kg, emission_secondary_per_kg                 : building type x material x region x year
+with respect to a change of the parameter in all years (the base & the changes of the Parameter by the same amount, as a change of the values of
+that building type (x material) & region in the input file). The derivatives with respect to the parameters of other regions are 0.
+Where the model has a kink (a year in which the negative inflow correction starts or stops, inflow equal to the available recovery or reuse),
+the derivative of the branch taken by the values is returned. The floor area (not a parameter here) is computed as in run.
+
+"""
+
+import numpy as np
+
+from .inputs import load_inputs
+from .floor_area import compute_floor_area
+from .stock import inflow_outflown_tangent
+from .materials import material_outflow
+from .emissions import compute_emissions, compute_emissions_tangent
+
+# the parameters of the Jacobian blocks (the lifetimes by building type x region, the others by building type x material x region)
+lifetime_parameters = ['lifetime_shape', 'lifetime_scale']
+material_parameters = ['material_intensity', 'recovery_rate', 'reuse_rate', 'emission_primary_per_kg', 'emission_secondary_per_kg']
+
+def compute_derivatives(config, inputs, floor_area):
+    """
+    Derivatives stage: returns a dictionary with the 'emission_total' (region x year) & a dictionary 'jacobian' of the Jacobian blocks
+    (see above) by parameter name.
+    """
+    m2 = floor_area['m2']
+    material_flows = {'inflow': np.zeros(inputs['material_intensity'].shape), 'outflow': np.zeros(inputs['material_intensity'].shape)}
+    jacobian = {name: np.zeros(m2.shape) for name in lifetime_parameters}
+    jacobian.update({name: np.zeros(inputs['material_intensity'].shape) for name in material_parameters})
+
+    for building in range(0, m2.shape[0]):
+        # stock dynamics & their derivatives with respect to the lifetime shape & scale (first dimension of the derivatives)
+        m2_inflow, m2_outflow_cohort, m2_inflow_dot, m2_outflow_cohort_dot = inflow_outflown_tangent(inputs['lifetime_shape'][building], inputs['lifetime_scale'][building],
+                                                                                                   m2[building], config.flag_Normal)
+        intensity = np.asarray(inputs['material_intensity'][building])
+        flows = {'inflow': m2_inflow[np.newaxis] * intensity, 'outflow': material_outflow(m2_outflow_cohort, intensity)}
+        rates = {name: np.asarray(inputs[name][building]) for name in material_parameters[1:]}
+
+        material_flows['inflow'][building], material_flows['outflow'][building] = flows['inflow'], flows['outflow']
+
+        # tangents of the material flows, one per parameter kind (leading dimension), each material x region x year cell with respect to the parameter of that cell
+        tangents = [{'inflow': m2_inflow_dot[:, np.newaxis] * intensity, 'outflow': material_outflow(m2_outflow_cohort_dot, intensity)},
+                    {'inflow': np.broadcast_to(m2_inflow, intensity.shape), 'outflow': np.broadcast_to(m2_outflow_cohort.sum(axis = -1), intensity.shape)}]
+        tangents += [{name: 1} for name in material_parameters[1:]]
+        for name, tangent in zip(['lifetime'] + material_parameters, tangents):
+            emission_dot = compute_emissions_tangent(rates, flows, tangent)
+            emission_dot = emission_dot['emission_primary'] + emission_dot['emission_secondary']
+            if name == 'lifetime':
+                # the lifetimes affect all materials of the building type & region
+                for number, lifetime_name in enumerate(lifetime_parameters):
+                    jacobian[lifetime_name][building] = emission_dot[number].sum(axis = 0)
+            else:
+                jacobian[name][building] = emission_dot
+
+    return {'emission_total': compute_emissions(config, inputs, material_flows)['emission_total'], 'jacobian': jacobian}
+
+def derivatives(config, inputs = None):
+    """The total emissions & their Jacobian blocks (see compute_derivatives) of a configuration."""
+    if inputs is None:
+        inputs = load_inputs(config)
+    return compute_derivatives(config, inputs, compute_floor_area(config, inputs))
+
+# The end.
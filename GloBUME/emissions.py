@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Embodied emissions of materials production, by building type, material, region & year
+
+The material inflow is split into primary & secondary (recovered) materials, based on the available recovery & reuse from the material outflow:
+    recovery  = MIN(inflow, outflow * recovery rate)      (recovery means total scrap collection)
+    reuse     = MIN(inflow, outflow * reuse rate)
+    primary   = inflow - recovery
+    secondary = recovery - reuse
+and multiplied by the emission factors of primary & secondary production.
+compute_emissions_tangent propagates derivatives (forward mode) through these products & the MIN() of the recovery & reuse.
+
+"""
+
+import numpy as np
+
+def compute_emissions(config, inputs, material_flows):
+    """
+    Emissions stage: uses the material 'inflow' & 'outflow' of the materials stage (building type x material x region x year), returns a dictionary
+    with the 'primary', 'secondary', 'emission_primary' & 'emission_secondary' arrays (building type x material x region x year) and the 'emission_total' by region x year.
+    """
+    building_materials_inflow = material_flows['inflow']
+    building_materials_outflow = material_flows['outflow']
+
+    # calculating available material recovery and reuse (recovery means total scrap collection)
+    materials_recovery_available = building_materials_outflow * inputs['recovery_rate']
+    materials_reuse_available = building_materials_outflow * inputs['reuse_rate']
+
+    # calculating primary and secondary materials
+    a = building_materials_inflow
+    b = materials_recovery_available
+    c = materials_reuse_available
+
+    materials_recovery = np.where(a < b, a, b)
+    materials_reuse = np.where(a < c, a, c)
+    materials_primary = a - materials_recovery
+    materials_secondary = materials_recovery - materials_reuse
+
+    # calculating primary & secondary emissions
+    emission_primary = materials_primary * inputs['emission_primary_per_kg']
+    emission_secondary = materials_secondary * inputs['emission_secondary_per_kg']
+
+    # calculating total emissions (sum over building types & materials, the last 4 dimensions, so leading dimensions such as Monte Carlo draws are kept)
+    emission_primary_sum = emission_primary.sum(axis = (-4, -3))
+    emission_secondary_sum = emission_secondary.sum(axis = (-4, -3))
+    emission_total = emission_primary_sum + emission_secondary_sum
+
+    return {'primary': materials_primary, 'secondary': materials_secondary, 'emission_primary': emission_primary, 'emission_secondary': emission_secondary, 'emission_total': emission_total}
+
+def compute_emissions_tangent(inputs, material_flows, tangents):
+    """
+    Derivatives (forward mode) of the emissions of primary & secondary production (before the sum over building types & materials):
+    tangents is a dictionary with the derivatives of the material 'inflow' & 'outflow' and of the 'recovery_rate', 'reuse_rate',
+    'emission_primary_per_kg' & 'emission_secondary_per_kg' (missing: 0), with the same trailing dimensions as material_flows & any leading
+    (tangent) dimensions. The MIN() of the recovery & reuse follows the branch of the values (the inflow if the inflow < the available recovery).
+    Returns the derivatives of 'emission_primary' & 'emission_secondary'.
+    """
+    a = material_flows['inflow']
+    outflow = material_flows['outflow']
+    b = outflow * inputs['recovery_rate']
+    c = outflow * inputs['reuse_rate']
+    materials_recovery = np.where(a < b, a, b)
+    materials_reuse = np.where(a < c, a, c)
+
+    a_dot = tangents.get('inflow', 0)
+    outflow_dot = tangents.get('outflow', 0)
+    b_dot = outflow_dot * inputs['recovery_rate'] + outflow * tangents.get('recovery_rate', 0)
+    c_dot = outflow_dot * inputs['reuse_rate'] + outflow * tangents.get('reuse_rate', 0)
+    recovery_dot = np.where(a < b, a_dot, b_dot)
+    reuse_dot = np.where(a < c, a_dot, c_dot)
+
+    emission_primary_dot = (a_dot - recovery_dot) * inputs['emission_primary_per_kg'] + (a - materials_recovery) * tangents.get('emission_primary_per_kg', 0)
+    emission_secondary_dot = (recovery_dot - reuse_dot) * inputs['emission_secondary_per_kg'] + (materials_recovery - materials_reuse) * tangents.get('emission_secondary_per_kg', 0)
+
+    return {'emission_primary': emission_primary_dot, 'emission_secondary': emission_secondary_dot}
+
+# The end.
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming statistics of a Monte Carlo ensemble, without keeping the draws
+
+An EnsembleReducer keeps, for each cell of an output (e.g. region x year of the total emissions), the number of draws, the running mean
+& sum of squared deviations (variance), the minimum & maximum and a t-digest style sketch of the distribution: at most `compression`
+centroids (mean & weight) per cell, small in the tails & large around the median, from which the quantiles are interpolated.
+The draws are added batch by batch & reducers of separate processes are merged, the memory does not depend on the number of draws
+(about (2 x compression + 4) floats per cell). The mean & variance are exact (up to rounding), the quantiles approximate:
+exact as long as a cell has no more draws than centroids, otherwise within about 1% of the draws (in quantile) of the exact quantile.
+
+ensemble(config, draws) runs the draws of monte_carlo.py on a pool of processes, each process reduces its own draws & the reducers are
+merged in the main process. write_ensemble writes only the summary cubes (mean, sd, p5, p50 & p95 by default) of the total emissions
+& the material inflow & outflow, from 2015 by default, in the format(s) of the Config, e.g. output_emission/GHG_total_p95.csv.
+
+Command line, from the GloBUME-main folder, e.g.:
+    python -m GloBUME.ensemble --draws 10000 --processes 32
+
+"""
+
+import concurrent.futures
+import os
+import time
+import numpy as np
+
+from .config import years
+from .monte_carlo import default_distributions, run_draws, preload, argument_parser, arguments_settings
+from .output import material_output, emission_output, write_output
+
+# the default statistics of the summary & the first year of the summary (the years of the IMAGE scenario data)
+default_statistics = ['mean', 'sd', 'p5', 'p50', 'p95']
+summary_first_year = 2015
+
+class EnsembleReducer(object):
+    """
+    Running statistics of an ensemble of arrays of the same shape (one value per draw & cell).
+    """
+    def __init__(self, shape, compression = 32):
+        self.shape = tuple(shape)
+        self.compression = compression
+        self.count = 0
+        self.mean = np.zeros(self.shape)
+        self.m2 = np.zeros(self.shape)          # sum of the squared deviations from the mean
+        self.minimum = np.full(self.shape, np.inf)
+        self.maximum = np.full(self.shape, -np.inf)
+        self.centroids = np.zeros(self.shape + (0,))
+        self.weights = np.zeros(self.shape + (0,))
+
+    def add(self, values):
+        """Add a batch of draws (draw x shape)."""
+        values = np.asarray(values, dtype = float).reshape((-1,) + self.shape)
+        if values.shape[0] == 0:
+            return
+        mean = values.mean(axis = 0)
+        self.combine(values.shape[0], mean, ((values - mean) ** 2).sum(axis = 0), values.min(axis = 0), values.max(axis = 0),
+                     np.moveaxis(values, 0, -1), np.ones(self.shape + (values.shape[0],)))
+
+    def merge(self, other):
+        """Add the draws of another reducer (e.g. of another process)."""
+        if other.shape != self.shape:
+            raise ValueError('cannot merge the statistics of shape ' + str(other.shape) + ' into ' + str(self.shape))
+        if other.count > 0:
+            self.combine(other.count, other.mean, other.m2, other.minimum, other.maximum, other.centroids, other.weights)
+
+    def combine(self, count, mean, m2, minimum, maximum, centroids, weights):
+        # mean & variance of the union of 2 sets (Chan et al.)
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (count / total)
+        self.m2 = self.m2 + m2 + delta ** 2 * (self.count * count / total)
+        self.count = total
+        self.minimum = np.minimum(self.minimum, minimum)
+        self.maximum = np.maximum(self.maximum, maximum)
+        self.centroids, self.weights = compress(np.concatenate([self.centroids, centroids], axis = -1), np.concatenate([self.weights, weights], axis = -1), self.compression)
+
+    @property
+    def variance(self):
+        """Sample variance (n - 1) of each cell."""
+        return self.m2 / (self.count - 1) if self.count > 1 else np.full(self.shape, np.nan)
+
+    @property
+    def sd(self):
+        return np.sqrt(self.variance)
+
+    @property
+    def nbytes(self):
+        return sum(values.nbytes for values in [self.mean, self.m2, self.minimum, self.maximum, self.centroids, self.weights])
+
+    def quantile(self, q):
+        """The approximate q-quantile (0 <= q <= 1) of each cell."""
+        if self.count == 0:
+            return np.full(self.shape, np.nan)
+        order = np.argsort(np.where(self.weights > 0, self.centroids, np.inf), axis = -1, kind = 'stable')
+        centroids, weights = np.take_along_axis(self.centroids, order, -1), np.take_along_axis(self.weights, order, -1)
+        # piecewise linear between the minimum (at 0 draws), the centroid means (at the middle of their weights) & the maximum (at all draws)
+        empty = weights == 0
+        edge = np.ones(self.shape + (1,))
+        position = np.concatenate([0 * edge, np.where(empty, self.count, np.cumsum(weights, axis = -1) - weights / 2), self.count * edge], axis = -1)
+        value = np.concatenate([self.minimum[..., np.newaxis], np.where(empty, self.maximum[..., np.newaxis], centroids), self.maximum[..., np.newaxis]], axis = -1)
+        target = q * self.count
+        upper = np.clip(np.sum(position < target, axis = -1, keepdims = True), 1, position.shape[-1] - 1)
+        x0, x1 = np.take_along_axis(position, upper - 1, -1), np.take_along_axis(position, upper, -1)
+        y0, y1 = np.take_along_axis(value, upper - 1, -1), np.take_along_axis(value, upper, -1)
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            fraction = np.clip(np.where(x1 > x0, (target - x0) / (x1 - x0), 1), 0, 1)
+        return (y0 + fraction * (y1 - y0))[..., 0]
+
+    def statistic(self, name):
+        """A statistic by name: 'mean', 'sd', 'variance', 'min', 'max' or 'p<percent>' (e.g. 'p5', 'p50', 'p97.5')."""
+        if name == 'min':
+            return self.minimum.copy()
+        elif name == 'max':
+            return self.maximum.copy()
+        elif name in ['mean', 'sd', 'variance']:
+            return np.array(getattr(self, name))
+        elif name.startswith('p'):
+            return self.quantile(float(name[1:]) / 100)
+        raise ValueError('unknown statistic ' + str(name))
+
+    def __repr__(self):
+        return 'EnsembleReducer(shape = ' + str(self.shape) + ', ' + str(self.count) + ' draws)'
+
+def compress(centroids, weights, compression):
+    """
+    Merge the centroids (mean & weight, ... x centroid) of each cell to at most compression centroids: the centroids are sorted &
+    grouped by the t-digest scale function of their position (quantile), so that the groups are small in the tails & large around the median.
+    """
+    if centroids.shape[-1] <= compression:
+        return centroids, weights
+    shape = centroids.shape[:-1]
+    centroids, weights = centroids.reshape(-1, centroids.shape[-1]), weights.reshape(-1, weights.shape[-1])
+    cells = centroids.shape[0]
+    order = np.argsort(np.where(weights > 0, centroids, np.inf), axis = 1, kind = 'stable')
+    centroids, weights = np.take_along_axis(centroids, order, 1), np.take_along_axis(weights, order, 1)
+    quantile = (np.cumsum(weights, axis = 1) - weights / 2) / weights.sum(axis = 1, keepdims = True)
+    group = np.minimum(np.floor(compression * (np.arcsin(2 * quantile - 1) / np.pi + 0.5)), compression - 1).astype(np.intp)
+    group += np.arange(0, cells)[:, np.newaxis] * compression
+    group_weights = np.bincount(group.ravel(), weights.ravel(), minlength = cells * compression)
+    group_sums = np.bincount(group.ravel(), (np.where(weights > 0, centroids, 0) * weights).ravel(), minlength = cells * compression)
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        group_means = np.where(group_weights > 0, group_sums / group_weights, 0)
+    return group_means.reshape(shape + (compression,)), group_weights.reshape(shape + (compression,))
+
+def reduce_draws(config, distributions, seed, draws, batch = 8, outputs = ('emission_total', 'material_inflow', 'material_outflow'), first_year = summary_first_year, compression = 32):
+    """
+    Run the draws (list of draw numbers) in batches (see monte_carlo.run_draws) & reduce the outputs from first_year on.
+    Returns a dictionary of EnsembleReducers by output name.
+    """
+    start = years.index(first_year)
+    reducers = {}
+    for number in range(0, len(draws), batch):
+        results = run_draws(config, distributions, seed, draws[number:number + batch], outputs)
+        for name in outputs:
+            values = results[name][..., start:]
+            if name not in reducers:
+                reducers[name] = EnsembleReducer(values.shape[1:], compression)
+            reducers[name].add(values)
+    return reducers
+
+def ensemble(config, draws, distributions = None, seed = 0, batch = 8, processes = None, outputs = ('emission_total', 'material_inflow', 'material_outflow'),
+             first_year = summary_first_year, compression = 32):
+    """
+    Run draws (number of draws) of the Monte Carlo analysis (see monte_carlo.monte_carlo) & reduce them to running statistics, the draws are
+    split over the processes (processes = None: the number of cpus, 1: in this process), each process returns the reducers of its draws.
+    Returns a dictionary of EnsembleReducers by output name ('emission_total': region x year, 'material_inflow' & 'material_outflow':
+    building type x material x region x year, from first_year on).
+    """
+    distributions = default_distributions if distributions is None else distributions
+    if processes == 1:
+        return reduce_draws(config, distributions, seed, list(range(0, draws)), batch, outputs, first_year, compression)
+    parts = min(processes or os.cpu_count() or 1, draws)
+    part_draws = [list(range(draws * part // parts, draws * (part + 1) // parts)) for part in range(0, parts)]
+    reducers = None
+    merged = 0   # number of parts merged
+    preload(config, distributions)
+    with concurrent.futures.ProcessPoolExecutor(max_workers = processes) as pool:
+        futures = {pool.submit(reduce_draws, config, distributions, seed, draw_part, batch, outputs, first_year, compression): part for part, draw_part in enumerate(part_draws)}
+        # merged in the order of the parts (as soon as the part before is merged), so the result does not depend on the timing of the processes
+        done = {}
+        for future in concurrent.futures.as_completed(futures):
+            done[futures[future]] = future.result()
+            while merged in done:
+                part_reducers = done.pop(merged)
+                if reducers is None:
+                    reducers = part_reducers
+                else:
+                    for name in outputs:
+                        reducers[name].merge(part_reducers[name])
+                merged += 1
+    return reducers
+
+def summary_file(name, statistic):
+    """File name of a statistic, e.g. output_emission/GHG_total.csv -> output_emission/GHG_total_p95.csv."""
+    base, extension = os.path.splitext(name)
+    return base + '_' + statistic + extension
+
+def write_ensemble(config, reducers, first_year = summary_first_year, statistics = default_statistics):
+    """
+    Write the statistics of the total emissions (next to config.emission_output) & of the material flows (next to config.material_output,
+    if not None & both flows were reduced), one file per statistic in the format(s) of the config.
+    """
+    columns = years[years.index(first_year):]
+    for statistic in statistics:
+        if 'emission_total' in reducers:
+            write_output(config, emission_output({'emission_total': reducers['emission_total'].statistic(statistic)}, 'GHG_total_' + statistic, columns),
+                         summary_file(config.emission_output, statistic))
+        if config.material_output is not None and 'material_inflow' in reducers and 'material_outflow' in reducers:
+            material_flows = {'inflow': reducers['material_inflow'].statistic(statistic), 'outflow': reducers['material_outflow'].statistic(statistic)}
+            write_output(config, material_output(material_flows, 'material_output_' + statistic, columns), summary_file(config.material_output, statistic))
+
+def main(arguments = None):
+    parser = argument_parser('Monte Carlo ensemble of GloBUME: samples the lifetimes, material intensities & recovery/reuse rates, writes the statistics of the total emissions & material flows.')
+    parser.add_argument('--statistics', nargs = '+', default = default_statistics, help = "statistics to write, e.g. mean sd p5 p50 p95 (p<percent>, 'min', 'max')")
+    parser.add_argument('--first_year', type = int, default = summary_first_year, help = 'first year of the statistics')
+    parser.add_argument('--compression', type = int, default = 32, help = 'number of centroids per cell of the quantile sketch')
+    parser.add_argument('--output_format', nargs = '+', default = ['csv'], help = 'output format(s): csv, csv.gz, parquet, hdf5, netcdf')
+    parser.add_argument('--no_material_output', action = 'store_true', help = 'only the statistics of the total emissions')
+    args = parser.parse_args(arguments)
+    config, distributions = arguments_settings(args)
+    config.output_format = args.output_format
+    outputs = ('emission_total',)
+    if args.no_material_output:
+        config.material_output = None
+    else:
+        outputs += ('material_inflow', 'material_outflow')
+
+    start = time.time()
+    reducers = ensemble(config, args.draws, distributions, args.seed, args.batch, args.processes, outputs, args.first_year, args.compression)
+    write_ensemble(config, reducers, args.first_year, args.statistics)
+    print(args.draws, 'draws done in', round(time.time() - start, 1), 's, statistics written next to', config.file(config.emission_output))
+
+if __name__ == '__main__':
+    main()
+
+# The end.
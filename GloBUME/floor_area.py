@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Floor area stock (in millions of m2) by building type, region & year (1721-2060)
+
+COMMERCIAL building space demand is calculated from Gompertz (or Exponential Decay) curves of the service value added per capita (fitted, using separate regression model).
+RESIDENTIAL floor area is calculated from the population by housing type & our OWN average m2 per capita, corrected to comply with the IMAGE floorspace per capita.
+Both are extended with a historic tail (1721-1970), see historic_tail.py.
+
+"""
+
+import warnings
+import numpy as np
+
+from . import historic_tail
+
+# define a function evaluating the Gompertz (or ExpDec) curves for all regions, years & commercial types in one array operation
+# sva_pc: service value added per capita (year x region)
+# returns the total commercial m2/cap (year x region), the m2/cap of the 4 commercial types (type x year x region, in the order Office, Retail+, Hotels+, Govt+) & the minimum m2/cap per type (used later in the historic tail)
+def commercial_floorspace(sva_pc, gompertz, alpha, beta, gamma, flag_ExpDec):
+    sva = np.asarray(sva_pc, dtype = float)
+
+    # find the total commercial m2 stock per capita
+    if flag_ExpDec == 0:
+        total = alpha * np.exp(-beta * np.exp((-gamma/1000) * sva))
+    else:
+        total = np.maximum(0.542, alpha - beta * np.exp((-gamma/1000) * sva))
+
+    # get the square meter per capita floorspace for 4 commercial applications
+    params = np.array(gompertz.loc[['a','b','c'], ['Office','Retail+','Hotels+','Govt+']], dtype = float)[:, :, np.newaxis, np.newaxis]
+    commercial = params[0] * np.exp(-params[1] * np.exp((-params[2]/1000) * sva))
+
+    # calculate minimum values for later use in historic tail (Region 20: China @ 134 $/cap SVA), starting from 25 m2/cap
+    minimum = np.minimum(25, commercial.min(axis = (1,2)))
+
+    # Then use the ratio's to subdivide the total commercial floorspace into 4 categories
+    commercial_sum = commercial[0] + commercial[1] + commercial[2] + commercial[3]
+    return total, total * (commercial / commercial_sum), minimum
+
+# define a function for the residential floor area by area (rural, urban), housing type (det, sem, app, hig), year & region, calculated as one float array (area x type x year x region)
+# people: area x year x region, housing_share & avg_m2_cap: area x type x region, floorspace (IMAGE, m2/cap): area x year x region
+def residential_floor_area(people, housing_share, avg_m2_cap, floorspace):
+    # calculate the total number of people (urban/rural) BY HOUSING TYPE (the sum of det,sem,app & hig equals the total population e.g. people_rur)
+    people_type = housing_share[:, :, np.newaxis, :] * people[:, np.newaxis, :, :]
+
+    # calculate the total m2 (urban/rural) BY HOUSING TYPE (= nr. of people * OWN avg m2, so not based on IMAGE)
+    m2_unadjusted = avg_m2_cap[:, :, np.newaxis, :] * people_type
+
+    # Sum all square meters by area & derive the average square meter per person implied by our OWN data
+    total_m2_adj = m2_unadjusted[:, 0] + m2_unadjusted[:, 1] + m2_unadjusted[:, 2] + m2_unadjusted[:, 3]
+    avg_m2_cap_adj = total_m2_adj / people
+
+    # factor to correct square meters per capita so that we respect the IMAGE data in terms of total m2, but we use our own distinction between Building types
+    m2_cap_adj_fact = floorspace / avg_m2_cap_adj
+
+    # All m2 by region (in millions), Building_type & year (using the correction factor, to comply with IMAGE avg m2/cap)
+    m2_res = m2_unadjusted * m2_cap_adj_fact[:, np.newaxis, :, :]
+    return people_type, m2_unadjusted, m2_cap_adj_fact, m2_res
+
+def compute_floor_area(config, inputs):
+    """
+    Floor area stage: returns a dictionary with the floor area stock 'm2' (millions of m2) as an array of building type x region x year (1721-2060),
+    the building types in the order of config.buildings, and the population 'people' by area (rural, urban) x region x year.
+    """
+    gompertz = inputs['gompertz']
+
+    # Select gompertz (or ExpDec) curve paramaters for the total commercial m2 demand (stock)
+    total = gompertz['All'] if config.flag_ExpDec == 0 else inputs['expdec']['All']
+    alpha, beta, gamma = total['a'], total['b'], total['c']
+
+    # commercial m2/cap (1971-2060) & the minimum values for the historic tail
+    commercial_m2_cap, commercial_m2_cap_types, minimum_com = commercial_floorspace(inputs['sva_pc'], gompertz, alpha, beta, gamma, config.flag_ExpDec)
+
+    # Generate the historic tails (1721-1970) for the floorspace/cap, the population & the rural/urban population share, combined with the IMAGE data (1971-2060)
+    # trends are derived from the first 10 years of IMAGE data; minimum/maximum values from the original IMAGE data (Just for residential, commercial minimum values have been calculated above)
+    floorspace_rur, floorspace_urb = inputs['floorspace']
+    tails = historic_tail.historic_tails(floorspace_urb, floorspace_rur, inputs['rurpop_1970'], inputs['rurpop_1980'], inputs['maximum_rurpop'], inputs['rurpop'], inputs['pop_1970'], inputs['pop'], inputs['hist_pop'], commercial_m2_cap_types, minimum_com)
+
+    # adjust the share for urban/rural only (shares in csv are as percantage of the total(Rur + Urb), we needed to adjust the urban shares to add up to 1, same for rural)
+    housing_share = inputs['housing_type'] / inputs['housing_type'].sum(axis = 1, keepdims = True)
+
+    # calculte the total rural/urban population (pop2 = millions of people, rurpop2 = % of people living in rural areas)
+    people = np.array([tails['rurpop'] * tails['pop'], tails['urbpop'] * tails['pop']])
+
+    # residential floor area (area x type x year x region), area: 0 = rural, 1 = urban; type: 0 = detached, 1 = semi-detached, 2 = appartments, 3 = high-rise
+    people_res, m2_unadjusted_res, m2_cap_adj_fact_res, m2_res = residential_floor_area(people, housing_share, inputs['avg_m2_cap'], np.array([tails['floorspace_rur'], tails['floorspace_urb']]))
+
+    # Add a checksum to see if calculations based on adjusted OWN avg m2 (by building type) now match the total m2 according to IMAGE.
+    m2_checksum = (m2_res[0,0] + m2_res[0,1] + m2_res[0,2] + m2_res[0,3]) - tails['floorspace_rur'] * people[0]
+    if m2_checksum.sum() > 0.0000001 or m2_checksum.sum() < -0.0000001:
+        warnings.warn("IMAGE & OWN m2 sums do not match")
+
+    # Total m2 for COMMERCIAL Buildings
+    commercial_m2 = np.array([tails['commercial_' + name] * tails['pop'] for name in ['office', 'retail', 'hotels', 'govern']])
+
+    # building type (8 residential, 4 commercial) x region x year
+    m2 = np.concatenate((m2_res.reshape(8, m2_res.shape[2], m2_res.shape[3]), commercial_m2)).transpose(0, 2, 1).copy()
+    return {'m2': m2, 'people': people.transpose(0, 2, 1).copy()}
+
+# The end.
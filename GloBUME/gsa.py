@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+Global sensitivity analysis of the total emissions (Morris elementary effects & Sobol indices)
+
+The factors are multipliers of (groups of) inputs, each varied over a range (low, high), e.g. 'lifetime_scale': (0.9, 1.1) multiplies the
+Weibull scale of all building types & regions by a value between 0.9 & 1.1:
+    lifetime_shape, lifetime_scale                  : the lifetimes (Weibull shape & scale, or Mean & StDev with flag_Normal)
+    material_intensity                              : the material intensities
+    gompertz_a, gompertz_b, gompertz_c              : the parameters of the Gompertz curves of the commercial floor area (all columns)
+    recovery_rate, reuse_rate                       : the recovery & reuse rates (at most 1)
+    emission_primary, emission_secondary            : the emission factors of primary & secondary material production
+Two designs:
+    morris : trajectories (number of samples) of k + 1 points on a grid of levels, one factor changes at each step, the elementary effects
+             give mu, mu_star (mean of the absolute effects) & sigma by factor, region & year
+    sobol  : Saltelli samples, the matrices A & B (number of samples rows, a scrambled Sobol sequence, preferably a power of 2) & the k
+             matrices AB_i (A with the column of factor i from B), N x (k + 2) runs, gives the first order (S1, Saltelli 2010) &
+             total (ST, Jansen) indices by factor, region & year
+The runs are evaluated in batches (all samples of a batch at once through the stock dynamics, materials & emissions, see
+monte_carlo.run_samples) on a pool of processes. The indices are written next to config.emission_output, e.g. output_emission/GHG_total_sobol_ST.csv,
+one row per factor & region & one column per year (from 2015 by default).
+
+Command line, from the GloBUME-main folder, e.g.:
+    python -m GloBUME.gsa --method sobol --samples 512 --processes 32
+
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import os
+import time
+import numpy as np
+import pandas as pd
+from scipy.stats import qmc
+
+from .config import Config, regions, years
+from .monte_carlo import bounds, preload, run_samples, scaled
+from .sweep import get_inputs
+
+# the inputs of the factors (name in the inputs, row of the Gompertz parameters)
+factor_inputs = {'lifetime_shape': 'lifetime_shape', 'lifetime_scale': 'lifetime_scale', 'material_intensity': 'material_intensity',
+                 'gompertz_a': 'a', 'gompertz_b': 'b', 'gompertz_c': 'c', 'recovery_rate': 'recovery_rate', 'reuse_rate': 'reuse_rate',
+                 'emission_primary': 'emission_primary_per_kg', 'emission_secondary': 'emission_secondary_per_kg'}
+
+default_factors = collections.OrderedDict([('lifetime_shape', (0.9, 1.1)), ('lifetime_scale', (0.9, 1.1)), ('material_intensity', (0.8, 1.2)),
+                                           ('gompertz_a', (0.95, 1.05)), ('gompertz_b', (0.95, 1.05)), ('gompertz_c', (0.95, 1.05)),
+                                           ('recovery_rate', (0.9, 1.1)), ('reuse_rate', (0.9, 1.1)),
+                                           ('emission_primary', (0.9, 1.1)), ('emission_secondary', (0.9, 1.1))])
+
+# first year of the indices
+gsa_first_year = 2015
+
+def factor_sample(inputs, factors, point):
+    """The sampled inputs of a point (one value between 0 & 1 per factor, mapped to the range of the factor)."""
+    samples = {}
+    for (name, (low, high)), value in zip(factors.items(), point):
+        if name not in factor_inputs:
+            raise ValueError('unknown factor ' + str(name) + ', choose from ' + ', '.join(factor_inputs))
+        multiplier = low + value * (high - low)
+        if name.startswith('gompertz_'):
+            gompertz = samples.get('gompertz', inputs['gompertz']).copy()
+            gompertz.loc[factor_inputs[name]] = gompertz.loc[factor_inputs[name]] * multiplier
+            samples['gompertz'] = gompertz
+        else:
+            samples[factor_inputs[name]] = scaled(inputs[factor_inputs[name]], multiplier, bounds.get(factor_inputs[name], (0, None)))
+    return samples
+
+def run_points(config, factors, points, first_year = gsa_first_year):
+    """Total emissions (point x region x year, from first_year on) of a batch of points (point x factor, values between 0 & 1)."""
+    inputs = get_inputs(config)
+    results = run_samples(config, inputs, [factor_sample(inputs, factors, point) for point in points])
+    return results['emission_total'][..., years.index(first_year):]
+
+def evaluate(config, factors, points, batch = 8, processes = None, first_year = gsa_first_year):
+    """
+    Total emissions (point x region x year) of all points of a design, in batches on a pool of processes (processes = None: the number of cpus, 1: in this process).
+    """
+    batches = [points[start:start + batch] for start in range(0, len(points), batch)]
+    results = [None] * len(batches)
+    if processes == 1:
+        for number, points_batch in enumerate(batches):
+            results[number] = run_points(config, factors, points_batch, first_year)
+    else:
+        preload(config, {})
+        with concurrent.futures.ProcessPoolExecutor(max_workers = processes) as pool:
+            futures = {pool.submit(run_points, config, factors, points_batch, first_year): number for number, points_batch in enumerate(batches)}
+            for future in concurrent.futures.as_completed(futures):
+                results[futures[future]] = future.result()
+    return np.concatenate(results)
+
+def morris_design(factors, trajectories, levels = 4, seed = 0):
+    """
+    Morris trajectories: returns the points ((k + 1) x trajectories, k) & for each step the factor that changes (trajectory x k)
+    & its change (+ or - delta, trajectory x k). The points are on a grid of levels between 0 & 1, delta = levels / (2 x (levels - 1)).
+    The number of levels must be even, so that each step (+ delta from the lower half of the grid, - delta from the upper half) stays on the grid.
+    """
+    if levels < 2 or levels % 2 != 0:
+        raise ValueError('the number of levels of the Morris design must be even (at least 2), not ' + str(levels))
+    random = np.random.default_rng(seed)
+    k = len(factors)
+    delta = levels / (2 * (levels - 1))
+    grid = np.arange(0, levels) / (levels - 1)
+    points = np.zeros((trajectories, k + 1, k))
+    order = np.zeros((trajectories, k), dtype = int)
+    steps = np.zeros((trajectories, k))
+    for trajectory in range(0, trajectories):
+        point = random.choice(grid, k)
+        order[trajectory] = random.permutation(k)
+        points[trajectory, 0] = point
+        for step, factor in enumerate(order[trajectory]):
+            point = point.copy()
+            steps[trajectory, step] = delta if point[factor] + delta <= 1 + 1e-12 else -delta
+            point[factor] += steps[trajectory, step]
+            points[trajectory, step + 1] = point
+    return points.reshape(-1, k), order, steps
+
+def morris_indices(outputs, order, steps):
+    """mu, mu_star & sigma of the elementary effects (factor x ...) of the outputs (point x ...) of a Morris design."""
+    trajectories, k = order.shape
+    outputs = outputs.reshape((trajectories, k + 1) + outputs.shape[1:])
+    effects = np.zeros((trajectories, k) + outputs.shape[2:])
+    expand = (slice(None),) + (np.newaxis,) * (outputs.ndim - 2)
+    for trajectory in range(0, trajectories):
+        effects[trajectory, order[trajectory]] = np.diff(outputs[trajectory], axis = 0) / steps[trajectory][expand]
+    return {'mu': effects.mean(axis = 0), 'mu_star': np.abs(effects).mean(axis = 0), 'sigma': effects.std(axis = 0, ddof = 1) if trajectories > 1 else np.full(effects.shape[1:], np.nan)}
+
+def saltelli_design(factors, samples, seed = 0):
+    """Saltelli points: the rows of A, B & AB_1 ... AB_k (samples x (k + 2), k), A & B from a scrambled Sobol sequence of dimension 2 x k."""
+    k = len(factors)
+    sequence = qmc.Sobol(2 * k, scramble = True, seed = np.random.default_rng(seed)).random(samples)
+    a, b = sequence[:, :k], sequence[:, k:]
+    ab = []
+    for factor in range(0, k):
+        ab_factor = a.copy()
+        ab_factor[:, factor] = b[:, factor]
+        ab.append(ab_factor)
+    return np.concatenate([a, b] + ab)
+
+def sobol_indices(outputs, k):
+    """First order (S1) & total (ST) Sobol indices (factor x ...) of the outputs (point x ...) of a Saltelli design."""
+    outputs = outputs.reshape((k + 2, -1) + outputs.shape[1:])
+    a, b, ab = outputs[0], outputs[1], outputs[2:]
+    variance = np.concatenate([a, b]).var(axis = 0)
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        first = np.mean(b * (ab - a), axis = 1) / variance
+        total = 0.5 * np.mean((a - ab) ** 2, axis = 1) / variance
+    return {'S1': first, 'ST': total}
+
+def gsa(config, method = 'sobol', samples = 256, factors = None, levels = 4, seed = 0, batch = 8, processes = None, first_year = gsa_first_year):
+    """
+    Global sensitivity analysis of the total emissions: method 'morris' (samples: number of trajectories) or 'sobol' (samples: N, N x (k + 2) runs).
+    factors: dictionary of factor name: (low, high), default_factors if None.
+    Returns a dictionary of the indices by name (factor x region x year, from first_year on).
+    """
+    factors = default_factors if factors is None else collections.OrderedDict(factors)
+    if method == 'morris':
+        points, order, steps = morris_design(factors, samples, levels, seed)
+        return morris_indices(evaluate(config, factors, points, batch, processes, first_year), order, steps)
+    elif method == 'sobol':
+        points = saltelli_design(factors, samples, seed)
+        return sobol_indices(evaluate(config, factors, points, batch, processes, first_year), len(factors))
+    raise ValueError("unknown method " + str(method) + ", choose 'morris' or 'sobol'")
+
+def indices_table(values, factors, first_year = gsa_first_year):
+    """Table of an index (factor x region x year): one row per factor & region, one column per year."""
+    index = pd.MultiIndex.from_product([list(factors), range(1, regions + 1)], names = ['factor', 'Region'])
+    return pd.DataFrame(values.reshape(-1, values.shape[-1]), index = index, columns = years[years.index(first_year):])
+
+def write_indices(config, indices, factors, method, first_year = gsa_first_year):
+    """Write the indices next to config.emission_output, e.g. GHG_total_sobol_S1.csv."""
+    base = os.path.splitext(config.file(config.emission_output))[0]
+    os.makedirs(os.path.dirname(base), exist_ok = True)
+    for name, values in indices.items():
+        indices_table(values, factors, first_year).to_csv(base + '_' + method + '_' + name + '.csv')
+
+def main(arguments = None):
+    parser = argparse.ArgumentParser(description = 'Global sensitivity analysis of the total emissions of GloBUME (Morris elementary effects or Sobol indices).')
+    parser.add_argument('--method', default = 'sobol', choices = ['morris', 'sobol'])
+    parser.add_argument('--samples', type = int, default = 256, help = 'number of trajectories (morris) or N (sobol, N x (k + 2) runs, preferably a power of 2)')
+    parser.add_argument('--factors', nargs = '+', default = list(default_factors), help = 'factors (default: all), name or name=low:high, e.g. lifetime_scale=0.8:1.2')
+    parser.add_argument('--levels', type = int, default = 4, help = 'number of levels of the Morris grid (even)')
+    parser.add_argument('--seed', type = int, default = 0, help = 'seed of the design')
+    parser.add_argument('--batch', type = int, default = 8, help = 'number of runs per batch (about 120 MB of memory per run & process, see monte_carlo)')
+    parser.add_argument('--processes', type = int, help = 'number of processes (default: the number of cpus)')
+    parser.add_argument('--first_year', type = int, default = gsa_first_year, help = 'first year of the indices')
+    parser.add_argument('--path', help = 'the GloBUME-main folder (default: the folder containing the GloBUME package)')
+    for flag in ['flag_alpha', 'flag_ExpDec', 'flag_Normal', 'flag_Mean']:
+        parser.add_argument('--' + flag, type = int, default = 0)
+    parser.add_argument('--dsm_backend', default = 'numpy', help = "backend of the dynamic stock model ('numpy' or 'numba')")
+    args = parser.parse_args(arguments)
+
+    config = Config(path = args.path, flag_alpha = args.flag_alpha, flag_ExpDec = args.flag_ExpDec, flag_Normal = args.flag_Normal, flag_Mean = args.flag_Mean, dsm_backend = args.dsm_backend)
+    factors = collections.OrderedDict()
+    for factor in args.factors:
+        name, _, factor_range = factor.partition('=')
+        if name not in default_factors:
+            parser.error('unknown factor ' + name + ', choose from ' + ', '.join(default_factors))
+        factors[name] = tuple(float(value) for value in factor_range.split(':')) if factor_range else default_factors[name]
+
+    start = time.time()
+    indices = gsa(config, args.method, args.samples, factors, args.levels, args.seed, args.batch, args.processes, args.first_year)
+    write_indices(config, indices, factors, args.method, args.first_year)
+    print(args.method, 'indices of', len(factors), 'factors done in', round(time.time() - start, 1), 's, written next to', config.file(config.emission_output))
+
+if __name__ == '__main__':
+    main()
+
+# The end.
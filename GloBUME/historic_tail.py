@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Historic tail (1721-1970) of the GloBUME floor area & population series
+
+The IMAGE data start in 1971. To start the stock model with an (almost) empty stock, the series are extended backwards:
+    1820-1970: the 1971 value, declining with a single global average annual trend (derived from the first 10 years of IMAGE data), bounded by the minimum (or maximum) found in the data
+    1721-1819: a linear increase over 100 years to the 1820 value, so 1720 = 0
+
+All series are handled as float arrays of year x region (26 regions in the columns), the full tail covers 1721-2060 (340 years).
+
+dependencies:
+    numpy >= 1.9
+
+"""
+
+import numpy as np
+
+first_year = 1721   # first year of the tail (linear increase from 0 in 1720)
+trend_year = 1820   # first year of the trend-based tail
+image_year = 1971   # first year of the IMAGE data
+
+def average_trend(series):
+    """
+    Average global annual trend in % decrease per annum, based on the first 10 years of IMAGE data.
+    series is a float array of year x region, starting in 1971 (at least 11 years).
+    """
+    series = np.asarray(series, dtype=float)
+    # the growth by year & region (1971/1972 ... 1980/1981), averaged over the years (sum in year order)
+    trend_by_year = series[0:10] / series[1:11]
+    trend_by_region = np.add.reduce(trend_by_year, axis=0) / 10
+    return (1 - (np.sum(trend_by_region) / trend_by_region.shape[0])) * 100
+
+def decline(value_1971, trend, minimum):
+    """
+    Values between 1820 & 1970: MAX of 1) the MINimum value & 2) the 1971 value declining with the global trend (% per annum).
+    value_1971 is an array of regions, returns an array of year (1820-1970) x region.
+    """
+    year = np.arange(trend_year, image_year)[:, np.newaxis]
+    return np.maximum(minimum, np.asarray(value_1971, dtype=float) * ((100 - trend) / 100) ** (image_year - year))
+
+def ramp(value_1820):
+    """
+    Values between 1721 & 1819: linear increase over a 100 year time period to the 1820 value (so 1720 = 0).
+    MAX(0,...) Because of floating point deviations, leading to negative stock in some cases.
+    value_1820 is an array of regions, returns an array of year (1721-1819) x region.
+    """
+    time = np.arange(first_year, trend_year)[:, np.newaxis]
+    value_1820 = np.asarray(value_1820, dtype=float)
+    return np.maximum(0.0, value_1820 - (value_1820 / 100) * (trend_year - time))
+
+def full_tail(tail_1820_1970, image):
+    """Stack the ramp (1721-1819), the given 1820-1970 tail & the IMAGE data (1971-2060) into one array of year (1721-2060) x region."""
+    return np.concatenate((ramp(tail_1820_1970[0]), tail_1820_1970, np.asarray(image, dtype=float)), axis=0)
+
+def historic_tails(floorspace_urb, floorspace_rur, rurpop_1970, rurpop_1980, maximum_rurpop, rurpop2, pop_1970, pop2, hist_pop, commercial, minimum_com):
+    """
+    Generate the nine tail series over 1721-2060, returned as a dictionary of float arrays (year x region):
+    floorspace_urb, floorspace_rur, rurpop, urbpop, pop, commercial_office, commercial_retail, commercial_hotels & commercial_govern.
+
+    floorspace_urb, floorspace_rur : IMAGE floorspace in m2/cap, 1971-2060 x region
+    rurpop_1970, rurpop_1980       : rural population share in 1970 & 1980 by region
+    maximum_rurpop                 : maximum rural population share in the IMAGE data
+    rurpop2, pop2                  : interpolated rural population share & population (millions), 1971-2060 x region
+    pop_1970                       : population (millions) in 1970 by region
+    hist_pop                       : historic population as a share of the 1970 population, 1820-1970 x region
+    commercial                     : commercial m2/cap of office, retail, hotels & govern, type x 1971-2060 x region
+    minimum_com                    : minimum commercial m2/cap by type
+    """
+    floorspace_urb = np.asarray(floorspace_urb, dtype=float)
+    floorspace_rur = np.asarray(floorspace_rur, dtype=float)
+    commercial = np.asarray(commercial, dtype=float)
+    tails = {}
+
+    # RESIDENTIAL floorspace: global trend, bounded by the minimum in the IMAGE data (Region 20: China)
+    tails['floorspace_urb'] = full_tail(decline(floorspace_urb[0], average_trend(floorspace_urb), floorspace_urb.min()), floorspace_urb)
+    tails['floorspace_rur'] = full_tail(decline(floorspace_rur[0], average_trend(floorspace_rur), floorspace_rur.min()), floorspace_rur)
+
+    # COMMERCIAL floorspace: global trend, bounded by the minimum values calculated from the Gompertz curves
+    for number, name in enumerate(['office', 'retail', 'hotels', 'govern']):
+        tails['commercial_' + name] = full_tail(decline(commercial[number][0], average_trend(commercial[number]), minimum_com[number]), commercial[number])
+
+    # RURAL population: average annual INcrease by region (1970-1980), MIN of 1) the MAXimum value (Region 9 : Eastern Africa) & 2) the calculated value
+    rurpop_1970 = np.asarray(rurpop_1970, dtype=float)
+    rurpop_trend_by_region = ((1 - (np.asarray(rurpop_1980, dtype=float) / rurpop_1970)) / 10) * 100
+    year = np.arange(trend_year, image_year)[:, np.newaxis]
+    rurpop_1820_1970 = np.minimum(maximum_rurpop, rurpop_1970 * ((100 + rurpop_trend_by_region) / 100) ** (1970 - year))
+    tails['rurpop'] = full_tail(rurpop_1820_1970, rurpop2)
+    tails['urbpop'] = full_tail(1 - rurpop_1820_1970, 1 - np.asarray(rurpop2, dtype=float))
+
+    # POPULATION: just add the tail to the population (no min/max & trend is pre-calculated in hist_pop)
+    pop_1820_1970 = np.asarray(hist_pop, dtype=float) * np.asarray(pop_1970, dtype=float)
+    tails['pop'] = full_tail(pop_1820_1970, pop2)
+
+    return tails
+
+# The end.
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Binary cache of the csv input files
+
+Each csv-file in the files_* folders is converted once into a typed binary store in the cache folder (same sub-folders):
+    <name>.npy  : the float columns as one float64 array (rows x columns), memory-mapped when loaded
+    <name>.json : the manifest, with the column names & order, the dtypes, the values of the other (text & integer) columns
+                  and the size, modification time & hash of the source csv-file
+A cached file is used as long as its source did not change: same size & modification time, or (if these changed) the same hash.
+Otherwise only that file is parsed & converted again.
+
+"""
+
+import hashlib
+import json
+import os
+import warnings
+import numpy as np
+import pandas as pd
+
+version = 1     # version of the cache format, files of another version are converted again
+
+def file_hash(file):
+    """sha1 hash of the content of a file."""
+    sha1 = hashlib.sha1()
+    with open(file, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+class InputCache(object):
+    """
+    Cache of the csv-files below path (the GloBUME-main folder), stored in cache_path.
+    """
+    def __init__(self, path, cache_path):
+        self.path = path
+        self.cache_path = cache_path
+        self.hits = 0       # files loaded from the cache
+        self.builds = 0     # files (re)converted
+
+    def files(self, name):
+        """Source file, array file & manifest file of a csv-file (name relative to path)."""
+        source = os.path.join(self.path, name)
+        relative = os.path.relpath(source, self.path)
+        if relative.startswith(os.pardir):  # files outside the GloBUME-main folder (e.g. alternative emission factors) are stored by the hash of their path
+            relative = os.path.join('external', hashlib.sha1(os.path.abspath(source).encode()).hexdigest()[:16] + '_' + os.path.basename(source))
+        base = os.path.join(self.cache_path, os.path.splitext(relative)[0])
+        return source, base + '.npy', base + '.json'
+
+    def read(self, name):
+        """Read a csv-file (name relative to path) as a DataFrame, from the cache if the source did not change."""
+        source, array_file, manifest_file = self.files(name)
+        manifest = None
+        if os.path.isfile(manifest_file) and os.path.isfile(array_file):
+            with open(manifest_file) as f:
+                manifest = json.load(f)
+            if not self.valid(source, manifest, manifest_file):
+                manifest = None
+        if manifest is None:
+            return self.build(name)
+        self.hits += 1
+        return self.load(manifest, array_file)
+
+    def valid(self, source, manifest, manifest_file):
+        """Check whether the cached file is up to date with its source (size & modification time, or else the hash)."""
+        if manifest.get('version') != version:
+            return False
+        stat = os.stat(source)
+        if manifest['size'] == stat.st_size and manifest['mtime'] == stat.st_mtime_ns:
+            return True
+        if manifest['size'] != stat.st_size or manifest['hash'] != file_hash(source):
+            return False
+        # same content (e.g. the file was copied or touched): keep the cache, store the new modification time
+        manifest['mtime'] = stat.st_mtime_ns
+        self.write(manifest_file, lambda f: json.dump(manifest, f), 'w')
+        return True
+
+    def build(self, name):
+        """Parse a csv-file & store it in the cache, returns the parsed DataFrame."""
+        source, array_file, manifest_file = self.files(name)
+        stat = os.stat(source)
+        frame = pd.read_csv(source)
+        self.builds += 1
+
+        floats = [column for column in frame.columns if frame[column].dtype == np.float64]
+        others = [column for column in frame.columns if frame[column].dtype != np.float64]
+        manifest = {'version': version, 'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'hash': file_hash(source),
+                    'columns': list(frame.columns), 'floats': floats,
+                    'others': [{'name': column, 'dtype': str(frame[column].dtype), 'values': [None if pd.isnull(value) else value for value in frame[column].tolist()]} for column in others]}
+        try:
+            os.makedirs(os.path.dirname(array_file), exist_ok = True)
+            self.write(array_file, lambda f: np.save(f, np.ascontiguousarray(frame[floats].to_numpy(dtype = np.float64))), 'wb')
+            self.write(manifest_file, lambda f: json.dump(manifest, f), 'w')
+        except OSError as error:
+            warnings.warn('the input cache could not be written (' + str(error) + '), ' + name + ' is read from the csv-file.')
+        return frame
+
+    def load(self, manifest, array_file):
+        """DataFrame of a cached csv-file, the float columns are read from a memory-mapped array."""
+        frame = pd.DataFrame(np.load(array_file, mmap_mode = 'r'), columns = manifest['floats'], copy = False)
+        if len(manifest['others']) == 0:
+            return frame
+        # add the other columns in one go & restore the original column order
+        others = pd.DataFrame({column['name']: pd.array([np.nan if value is None else value for value in column['values']], dtype = column['dtype']) for column in manifest['others']})
+        return pd.concat([frame, others], axis = 1)[manifest['columns']]
+
+    def update(self):
+        """Convert all csv-files in the files_* folders below path, only the changed ones are parsed again. Returns the number of converted files."""
+        builds = self.builds
+        for folder in sorted(os.listdir(self.path)):
+            if not folder.startswith('files_') or not os.path.isdir(os.path.join(self.path, folder)):
+                continue
+            for root, dirs, names in os.walk(os.path.join(self.path, folder)):
+                for name in sorted(names):
+                    if name.endswith('.csv'):
+                        self.read(os.path.relpath(os.path.join(root, name), self.path))
+        return self.builds - builds
+
+    def write(self, file, save, mode):
+        # write to a temporary file first & replace, so parallel runs never read a partly written file
+        temporary = file + '.' + str(os.getpid()) + '.tmp'
+        with open(temporary, mode) as f:
+            save(f)
+        os.replace(temporary, file)
+
+# one cache per (GloBUME-main folder, cache folder), shared by all runs in a process
+caches = {}
+
+def input_cache(config):
+    """The InputCache of a configuration (None if config.input_cache is None)."""
+    if config.input_cache is None:
+        return None
+    key = (os.path.abspath(config.path), os.path.abspath(config.file(config.input_cache)))
+    if key not in caches:
+        caches[key] = InputCache(key[0], key[1])
+    return caches[key]
+
+# The end.
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Load the GloBUME input files & arrange the tables
+
+All files are read relative to the GloBUME-main folder of the configuration (no change of the working directory), through the binary input cache.
+The tables are arranged into float arrays with the regions in the order 1-26:
+    population & floor area data by year (rows) & region (columns), as in the IMAGE files
+    lifetimes, material intensities, recovery/reuse rates & emission factors by building type, (material,) region & year (1721-2060),
+    as Parameters (see parameter.py): the values of the first year & the years in which they change, broadcast to all years when used
+
+"""
+
+import numpy as np
+import pandas as pd
+
+from .config import regions, inflation, years, materials, buildings
+from .input_cache import input_cache
+from .parameter import Parameter
+
+region_columns = [str(region) for region in range(1, regions + 1)]
+
+# building type names as used in the input files
+residential_types = {'detached': 'Detached', 'semi-detached': 'Semi-detached', 'appartments': 'Appartments', 'high-rise': 'High-rise'}
+commercial_types = {'office': 'Offices', 'retail': 'Retail+', 'hotels': 'Hotels+', 'govern': 'Govt+'}
+
+def read_csv(config, name, index_col = None):
+    """
+    Read an input csv-file, name is relative to the GloBUME-main folder of the configuration.
+    The file is read from the binary input cache (see input_cache.py), unless config.input_cache is None.
+    """
+    cache = input_cache(config)
+    if cache is None:
+        return pd.read_csv(config.file(name), index_col = index_col)
+    frame = cache.read(name)
+    if index_col is not None:
+        frame = frame.set_index(list(frame.columns[index_col]))
+        if str(frame.index.name).startswith('Unnamed:'):  # no column name in the csv-file
+            frame.index.name = None
+    return frame
+
+def by_area(table, area):
+    """Select one area (Rural/Urban) of a table by region & area, returns an array of column x region (regions 1-26)."""
+    table = table.loc[table['Area'] == area].drop(columns = 'Area').set_index('Region').reindex(range(1, regions + 1))  # Remove area column
+    return np.array(table, dtype = float).T
+
+def time_series(values, first_year):
+    """Copy the values of the first available year (last axis) to the historic years, returns an array ending in the last model year with 340 years."""
+    return np.concatenate((np.repeat(values[..., 0:1], first_year - years[0], axis = -1), values), axis = -1)
+
+def input_key(config):
+    """The settings of a configuration the inputs depend on: configurations with the same key can share the loaded inputs."""
+    return (config.path, config.input_cache, config.flag_alpha, config.file_addition, config.recovery_rate, config.reuse_rate, config.emission_primary, config.emission_secondary)
+
+def material_intensity(config, file_addition = None):
+    """
+    Material density (kg/m2) by building type x material x region x year (1721-2060), from the material density files of the configuration
+    (or of another file_addition, e.g. '_low' or '_high').
+    """
+    file_addition = config.file_addition if file_addition is None else file_addition
+    building_materials = read_csv(config, 'files_material_density/Building_materials' + file_addition + '.csv').set_index(['Building_type', 'Region']).sort_index()     # the average material use per square meter (by building type, by region & by area)
+    materials_commercial = read_csv(config, 'files_material_density/materials_commercial' + file_addition + '.csv').set_index(['Building_type', 'Region']).sort_index() # 7 building materials in 4 commercial building types
+
+    intensity = np.zeros((len(buildings), len(materials), regions))
+    for number, (building, area) in enumerate(buildings):
+        for material_number, material in enumerate(materials):
+            if area == 'commercial':
+                intensity[number, material_number] = materials_commercial[material].loc[commercial_types[building]].reindex(range(1, regions + 1))
+            elif material == 'brick':
+                intensity[number, material_number] = building_materials['brick_' + area].loc[residential_types[building]].reindex(range(1, regions + 1))
+            else:
+                intensity[number, material_number] = building_materials[material].loc[residential_types[building]].reindex(range(1, regions + 1))
+
+    return Parameter(intensity)
+
+def load_inputs(config):
+    """
+    Load all input files for the configuration, returns a dictionary of arrays (& the Gompertz parameters as a labelled table).
+    """
+    inputs = {}
+
+    # Load Population, Floor area, and Service value added (SVA) Database csv-files
+    pop = read_csv(config, 'files_population/pop.csv', index_col = [0])                 # Pop; unit: million of people; meaning: global population (over time, by region)
+    rurpop = read_csv(config, 'files_population/rurpop.csv', index_col = [0])           # rurpop; unit: %; meaning: the share of people living in rural areas (over time, by region)
+    housing_type = read_csv(config, 'files_population/Housing_type.csv')                # Housing_type; unit: %; meaning: the share of the NUMBER OF PEOPLE living in a particular building type (by region & by area)
+    floorspace = read_csv(config, 'files_floor_area/res_Floorspace.csv')                # Floorspace; unit: m2/capita; meaning: the average m2 per capita (over time, by region & area)
+    floorspace = floorspace[floorspace.Region != regions + 1]                           # Remove empty region 27
+    avg_m2_cap = read_csv(config, 'files_floor_area/Average_m2_per_cap.csv')            # Avg_m2_cap; unit: m2/capita; meaning: average square meters per person (by region & area (rural/urban) & building type)
+    sva_pc_2005 = read_csv(config, 'files_GDP/sva_pc.csv', index_col = [0])
+    hist_pop = read_csv(config, 'files_initial_stock/hist_pop.csv', index_col = [0])    # initial population as a percentage of the 1970 population; unit: %; according to the Maddison Project Database (MPD) 2018 (Groningen University)
+
+    # Load fitted regression parameters for comercial floor area estimate
+    if config.flag_alpha == 0:
+        inputs['gompertz'] = read_csv(config, 'files_floor_area/files_commercial/Gompertz_parameters.csv', index_col = [0])
+    else:
+        inputs['gompertz'] = read_csv(config, 'files_floor_area/files_commercial/Gompertz_parameters_alpha.csv', index_col = [0])
+    inputs['expdec'] = read_csv(config, 'files_floor_area/files_commercial/ExpDec_parameters.csv', index_col = [0])    # fitted Exponential Decay parameters (flag_ExpDec = 1), only the total ('All') is used
+
+    # Ensure full time series for pop & rurpop (interpolation, some years are missing), Remove 1st year, to ensure same Table size as floorspace data (from 1971)
+    rurpop2 = rurpop.reindex(list(range(1970,2061,1))).interpolate().iloc[1:]
+    pop2 = pop.reindex(list(range(1970,2061,1))).interpolate().iloc[1:]
+
+    inputs['pop'] = np.array(pop2[region_columns], dtype = float)                 # 1971-2060 x region
+    inputs['rurpop'] = np.array(rurpop2[region_columns], dtype = float)           # 1971-2060 x region
+    inputs['pop_1970'] = np.array(pop.loc[1970, region_columns], dtype = float)
+    inputs['rurpop_1970'] = np.array(rurpop.loc[1970, region_columns], dtype = float)
+    inputs['rurpop_1980'] = np.array(rurpop.loc[1980, region_columns], dtype = float)
+    inputs['maximum_rurpop'] = rurpop.values.max()                                # Region 9 : Eastern Africa
+    inputs['hist_pop'] = np.array(hist_pop.loc[1820:1970, region_columns], dtype = float)
+
+    # we use the inflation corrected SVA to adjust for the fact that IMAGE provides gdp/cap in 2005 US$
+    inputs['sva_pc'] = np.array(sva_pc_2005.loc[1971:2060, region_columns], dtype = float) * inflation
+
+    # Restructure the tables to area (rural, urban) x year (1971-2060) x region; for floorspace
+    inputs['floorspace'] = np.array([floorspace.pivot(index = "t", columns = "Region", values = "Rural").reindex(columns = range(1, regions + 1)),
+                                     floorspace.pivot(index = "t", columns = "Region", values = "Urban").reindex(columns = range(1, regions + 1))], dtype = float)
+
+    # Restructuring for square meters (m2/cap) & the Housing types (% of population living in them), area (rural, urban) x housing type x region
+    inputs['avg_m2_cap'] = np.array([by_area(avg_m2_cap, 'Rural'), by_area(avg_m2_cap, 'Urban')])
+    inputs['housing_type'] = np.array([by_area(housing_type, 'Rural'), by_area(housing_type, 'Urban')])
+
+    # lifetime parameters (shape & scale) by building type x region, for 1721-2060
+    lifetimes = read_csv(config, 'files_lifetimes/lifetimes.csv').set_index(['Building_type', 'Area', 'Region']).sort_index()
+    lifetimes_comm = read_csv(config, 'files_lifetimes/lifetimes_comm.csv').set_index('Region').reindex(range(1, regions + 1))
+
+    shape = np.zeros((len(buildings), regions))
+    scale = np.zeros((len(buildings), regions))
+    for number, (building, area) in enumerate(buildings):
+        if area == 'commercial':
+            shape[number] = lifetimes_comm['Shape']
+            scale[number] = lifetimes_comm['Scale']
+        else:
+            shape[number] = lifetimes['Shape'].loc[(residential_types[building], area.capitalize())].reindex(range(1, regions + 1))
+            scale[number] = lifetimes['Scale'].loc[(residential_types[building], area.capitalize())].reindex(range(1, regions + 1))
+
+    # time-series data structure (building type x region x year), constant over the years
+    inputs['lifetime_shape'] = Parameter(shape)
+    inputs['lifetime_scale'] = Parameter(scale)
+    # *NOTE: here we have created these multiple-dimentional structures where the region, building type, and year are specified so that scenario analyses of e.g., the lifetime extension can be easily done using either Python or excel.
+
+    # load material density data csv-files (kg/m2) & restructure to building type x material x region x year (1721-2060)
+    inputs['material_intensity'] = material_intensity(config)
+    # *NOTE: here we have created these multiple-dimentional structures where the region, building type, and year are specified so that scenario analyses of e.g., light-weighting / substitution can be easily done using either Python or excel.
+
+    # load recovery and reuse csv-files (rows in the order building type x material x region, as in the material output), copy 1900 values to historic years
+    recovery_rate = read_csv(config, config.recovery_rate).set_index('Unnamed: 0')
+    reuse_rate = read_csv(config, config.reuse_rate).set_index('Unnamed: 0')
+    inputs['recovery_rate'] = Parameter.from_array(time_series(np.array(recovery_rate.iloc[:,4:], dtype = float), 1900).reshape(len(buildings), len(materials), regions, len(years)))
+    inputs['reuse_rate'] = Parameter.from_array(time_series(np.array(reuse_rate.iloc[:,4:], dtype = float), 1900).reshape(len(buildings), len(materials), regions, len(years)))
+
+    # load emission intensity csv-files, copy 2020 values to historic years
+    emission_primary_per_kg = read_csv(config, config.emission_primary).set_index('Region')
+    emission_secondary_per_kg = read_csv(config, config.emission_secondary).set_index('Region')
+    inputs['emission_primary_per_kg'] = Parameter.from_array(time_series(np.array(emission_primary_per_kg.iloc[:,4:], dtype = float), 2020).reshape(len(buildings), len(materials), regions, len(years)))
+    inputs['emission_secondary_per_kg'] = Parameter.from_array(time_series(np.array(emission_secondary_per_kg.iloc[:,4:], dtype = float), 2020).reshape(len(buildings), len(materials), regions, len(years)))
+    # *NOTE: here we have created these multiple-dimentional structures where the region, material type, and year are specified so that scenario analyses of e.g., increased recycling or energy transition can be easily done using either Python or excel.
+
+    return inputs
+
+# The end.
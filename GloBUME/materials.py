@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""
+Material inflow & outflow (Millions of kgs = *1000 tons) by building type, material, region & year
+
+The floor area inflow & outflow by cohort are multiplied by the material intensity (kg/m2) of the building type, region & cohort,
+for all building types, materials & regions at once:
+    inflow[building, material, region, year]  = m2_inflow[building, region, year] * intensity[building, material, region, year]
+    outflow[building, material, region, year] = SUM over cohorts (batched matrix product): m2_outflow_cohort[building, region, year, cohort] * intensity[building, material, region, cohort]
+The number of materials follows from the material intensity array, so adding a material only changes the input data.
+
+"""
+
+import numpy as np
+
+# first define a function for calculating the material outflow (m2_outflow_cohort: ... x region x year x cohort array, material_density: ... x material x region x cohort, the leading dimensions, e.g. the building types, are broadcast)
+# the year x cohort outflow matrix is multiplied by the material density vector by cohort, for all regions & materials at once, returns ... x material x region x year
+def material_outflow(m2_outflow_cohort, material_density):
+    return np.einsum('...ryc,...mrc->...mry', m2_outflow_cohort, material_density, optimize = True)
+
+def compute_materials(config, inputs, stock):
+    """
+    Materials stage: returns a dictionary with the material 'inflow' & 'outflow' (Millions of kgs) as arrays of
+    building type x material x region x year, the building types & materials in the order of config.buildings & config.materials.
+    """
+    intensity = inputs['material_intensity']
+
+    # Material inflow, by building type & material (broadcast over the materials)
+    inflow = stock['inflow'][:, np.newaxis, :, :] * intensity
+
+    # Material outflow, by building type & material (broadcast over the materials)
+    outflow = material_outflow(stock['outflow_cohort'], intensity)
+
+    return {'inflow': inflow, 'outflow': outflow}
+
+# The end.
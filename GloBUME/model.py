@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Run all stages of GloBUME for one configuration
+
+    load inputs -> floor area -> stock dynamics -> materials -> emissions
+
+With a stage cache (Config.stage_cache, see stage_cache.py) the results of the stages are loaded from the cache if their inputs did not change.
+
+"""
+
+import numpy as np
+
+from .inputs import load_inputs
+from .floor_area import compute_floor_area
+from .stock import compute_stock, building_stock
+from .materials import compute_materials
+from .emissions import compute_emissions
+from .output import write_material_output, write_emission_output
+from .stage_cache import stage_cache, stage_keys
+
+def run(config, inputs = None):
+    """
+    Run the model for the configuration & write the csv output (the material output only if config.material_output is not None). Already loaded inputs (for the same input files) can be passed to avoid reading them again.
+    Returns a dictionary with the configuration, the inputs & the results of all stages (with a stage cache, the stages that were not needed to get the later results from the cache are None).
+    """
+    if inputs is None:
+        inputs = load_inputs(config)
+
+    cache = stage_cache(config)
+    if cache is None:
+        floor_area = compute_floor_area(config, inputs)
+        stock = compute_stock(config, inputs, floor_area)
+        material_flows = compute_materials(config, inputs, stock)
+        emissions = compute_emissions(config, inputs, material_flows)
+    else:
+        floor_area, stock, material_flows, emissions = run_cached(config, inputs, cache)
+
+    if config.material_output is not None:
+        write_material_output(config, material_flows)
+    write_emission_output(config, emissions)
+
+    return {'config': config, 'inputs': inputs, 'floor_area': floor_area, 'stock': stock, 'materials': material_flows, 'emissions': emissions}
+
+def run_cached(config, inputs, cache):
+    """Run the stages with the stage cache, from the last stage back: a stage is only computed (or loaded) if a later stage is not in the cache."""
+    keys = stage_keys(config, inputs)
+    floor_area = stock = material_flows = None
+
+    emissions = cache.get('emissions', keys['emissions'])
+    if emissions is not None and config.material_output is None:
+        return floor_area, stock, material_flows, emissions
+
+    material_flows = cache.get('materials', keys['materials'])
+    if material_flows is None:
+        # stock dynamics by building type
+        parts = [cache.get('stock', key) for key in keys['stock']]
+        for building, key in enumerate(keys['stock']):
+            if parts[building] is None:
+                if floor_area is None:
+                    floor_area = cache.get('floor_area', keys['floor_area'])
+                if floor_area is None:
+                    floor_area = compute_floor_area(config, inputs)
+                    cache.put('floor_area', keys['floor_area'], floor_area)
+                inflow, outflow_cohort = building_stock(config, inputs, floor_area, building)
+                parts[building] = {'inflow': inflow, 'outflow_cohort': outflow_cohort}
+                cache.put('stock', key, parts[building])
+        stock = {'inflow': np.array([part['inflow'] for part in parts]), 'outflow_cohort': np.array([part['outflow_cohort'] for part in parts])}
+        material_flows = compute_materials(config, inputs, stock)
+        cache.put('materials', keys['materials'], material_flows)
+
+    if emissions is None:
+        emissions = compute_emissions(config, inputs, material_flows)
+        cache.put('emissions', keys['emissions'], emissions)
+    return floor_area, stock, material_flows, emissions
+
+# The end.
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+Monte Carlo uncertainty analysis of GloBUME
+
+The lifetimes (Weibull shape & scale), the material intensities & the recovery/reuse rates are sampled for each draw, from the distributions
+given by parameter (constant over the years, one value per building type (x material) x region):
+    ('normal', sd)          : the value times a normal factor with mean 1 & standard deviation sd (at least 0)
+    ('lognormal', sigma)    : the value times a lognormal factor with mean 1 & sigma of the underlying normal distribution
+    ('uniform', width)      : the value times a factor between 1 - width & 1 + width
+    ('triangular', low, high): the value times a triangular factor between 1 - low & 1 + high, with mode 1
+    ('triangular',)         : only for the material intensities: triangular between the _low & _high material files, with the _median file as mode
+                              (these files are not part of the repository, add them to files_material_density to use this distribution)
+The rates are kept between 0 & 1.
+Each draw has its own random generator (seeded by the seed & the number of the draw), so the draws do not depend on the batches or the processes.
+
+The floor area is computed once (it is not sampled). The draws (or any samples of the inputs, see run_samples) are run in batches through the stock dynamics, materials & emissions stages,
+with the draws as an additional (first) dimension, and the batches on a pool of processes.
+The memory taken by a batch grows with its number of draws: the survival tables, the stock & the outflow by cohort of one building type
+(draw x region x year x cohort, float64) take about 24 MB per draw each, e.g. about 190 MB each (roughly 1 GB in all) per process for a batch of 8 draws.
+
+Command line, from the GloBUME-main folder, e.g.:
+    python -m GloBUME.monte_carlo --draws 1000 --processes 32
+
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import copy
+import multiprocessing
+import os
+import time
+import numpy as np
+
+from .config import Config, regions, years
+from .inputs import input_key, material_intensity
+from .floor_area import compute_floor_area
+from .stock import inflow_outflown
+from .materials import material_outflow
+from .emissions import compute_emissions
+from .parameter import Parameter
+from .sweep import get_inputs
+
+# the sampled parameters, in the order in which they are drawn
+parameters = ['lifetime_shape', 'lifetime_scale', 'material_intensity', 'recovery_rate', 'reuse_rate']
+
+# bounds of the sampled values
+bounds = {'lifetime_shape': (0, None), 'lifetime_scale': (0, None), 'material_intensity': (0, None), 'recovery_rate': (0, 1), 'reuse_rate': (0, 1)}
+
+default_distributions = collections.OrderedDict([('lifetime_shape', ('normal', 0.1)), ('lifetime_scale', ('normal', 0.1)), ('material_intensity', ('triangular', 0.2, 0.2)),
+                                                 ('recovery_rate', ('uniform', 0.1)), ('reuse_rate', ('uniform', 0.1))])
+
+# the floor area & the low, median & high material intensities loaded in this process, by input key
+shared_floor_area = {}
+shared_intensity_range = {}
+
+def triangular(random, left, mode, right):
+    """Triangular distribution by inverse transform (also for left == right), random: uniform numbers between 0 & 1."""
+    left, mode, right = np.asarray(left, dtype = float), np.asarray(mode, dtype = float), np.asarray(right, dtype = float)
+    width = right - left
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        share = np.where(width > 0, (mode - left) / width, 0)
+    lower = left + np.sqrt(random * width * (mode - left))
+    upper = right - np.sqrt((1 - random) * width * (right - mode))
+    return np.where(random < share, lower, upper)
+
+def get_floor_area(config, inputs):
+    """The floor area of a configuration, computed once per process."""
+    key = (input_key(config), config.flag_ExpDec)
+    if key not in shared_floor_area:
+        shared_floor_area[key] = compute_floor_area(config, inputs)
+    return shared_floor_area[key]
+
+def intensity_range_files():
+    """The material intensity files of the distribution ('triangular',), relative to the GloBUME-main folder."""
+    return ['files_material_density/' + name + file_addition + '.csv' for file_addition in ['_low', '_median', '_high'] for name in ['Building_materials', 'materials_commercial']]
+
+def get_intensity_range(config):
+    """The low, median & high material intensities (from the _low, _median & _high files), loaded once per process."""
+    key = input_key(config)
+    if key not in shared_intensity_range:
+        missing = [name for name in intensity_range_files() if not os.path.isfile(config.file(name))]
+        if missing:
+            raise ValueError("the material intensity distribution ('triangular',) needs the files " + ', '.join(missing) +
+                             ", add them or give a relative range, e.g. ('triangular', 0.2, 0.2) (--intensity_range 0.2)")
+        shared_intensity_range[key] = [material_intensity(config, file_addition).base for file_addition in ['_low', '_median', '_high']]
+    return shared_intensity_range[key]
+
+def sample(config, inputs, distributions, seed, draw):
+    """The sampled parameters (Parameters) of one draw, as a dictionary by parameter name."""
+    random = np.random.default_rng([seed, draw])
+    samples = {}
+    for name in parameters:
+        if name not in distributions:
+            continue
+        distribution = distributions[name]
+        parameter = inputs[name]
+        shape = parameter.base.shape
+        if distribution[0] == 'triangular' and len(distribution) == 1:
+            if name != 'material_intensity':
+                raise ValueError("('triangular',) is only available for the material intensities, use ('triangular', low, high) for " + name)
+            low, median, high = get_intensity_range(config)
+            samples[name] = Parameter(triangular(random.random(shape), low, median, high))
+            continue
+        if distribution[0] == 'normal':
+            factor = 1 + distribution[1] * random.standard_normal(shape)
+        elif distribution[0] == 'lognormal':
+            factor = np.exp(distribution[1] * random.standard_normal(shape) - distribution[1] ** 2 / 2)
+        elif distribution[0] == 'uniform':
+            factor = random.uniform(1 - distribution[1], 1 + distribution[1], shape)
+        elif distribution[0] == 'triangular':
+            factor = triangular(random.random(shape), 1 - distribution[1], 1, 1 + distribution[2])
+        else:
+            raise ValueError('unknown distribution ' + str(distribution[0]) + ' for ' + name)
+        samples[name] = scaled(parameter, factor, bounds[name])
+    return samples
+
+def scaled(parameter, factor, bound = (None, None)):
+    """Parameter with all values (base & changes) multiplied by the factor (a number or an array of the shape of the base), clipped to the bound (lower, upper)."""
+    lower, upper = bound
+
+    def clipped(values):
+        return values if lower is None and upper is None else np.clip(values, lower, upper)
+
+    return Parameter(clipped(parameter.base * factor), {year: clipped(values * factor) for year, values in parameter.changes.items()})
+
+def run_draws(config, distributions, seed, draws, outputs = ('emission_total',)):
+    """
+    Run a batch of draws (list of draw numbers), with the draws as first dimension of all arrays.
+    Returns a dictionary with the outputs asked for: 'emission_total' (draw x region x year), 'material_inflow' & 'material_outflow' (draw x building type x material x region x year).
+    """
+    inputs = get_inputs(config)
+    return run_samples(config, inputs, [sample(config, inputs, distributions, seed, draw) for draw in draws], outputs)
+
+def run_samples(config, inputs, samples, outputs = ('emission_total',)):
+    """
+    Run a batch of samples (list of dictionaries of sampled inputs by name, the other inputs are those of inputs), with the samples as first
+    dimension of all arrays. The floor area is only recomputed for samples with other Gompertz parameters ('gompertz').
+    Returns a dictionary with the outputs asked for (see run_draws).
+    """
+    floor_area = get_floor_area(config, inputs)
+    m2 = np.array([floor_area['m2'] if 'gompertz' not in draw_samples else compute_floor_area(config, dict(inputs, gompertz = draw_samples['gompertz']))['m2'] for draw_samples in samples])
+
+    def stacked(name):
+        return np.array([np.asarray(draw_samples.get(name, inputs[name])) for draw_samples in samples])
+
+    shape, scale, intensity = stacked('lifetime_shape'), stacked('lifetime_scale'), stacked('material_intensity')
+    inflow = np.zeros(intensity.shape)
+    outflow = np.zeros(intensity.shape)
+    for building in range(0, intensity.shape[1]):
+        # stock dynamics of all samples & regions of the building type at once (sample x region rows)
+        m2_inflow, m2_outflow_cohort = inflow_outflown(shape[:, building].reshape(-1, len(years)), scale[:, building].reshape(-1, len(years)),
+                                                       m2[:, building].reshape(-1, len(years)), config.flag_Normal, config.dsm_backend, cache = False)
+        m2_inflow = m2_inflow.reshape(len(samples), regions, len(years))
+        m2_outflow_cohort = m2_outflow_cohort.reshape(len(samples), regions, len(years), len(years))
+        inflow[:, building] = m2_inflow[:, np.newaxis] * intensity[:, building]
+        outflow[:, building] = material_outflow(m2_outflow_cohort, intensity[:, building])
+
+    rates = {name: stacked(name) for name in ['recovery_rate', 'reuse_rate', 'emission_primary_per_kg', 'emission_secondary_per_kg']}
+    emissions = compute_emissions(config, rates, {'inflow': inflow, 'outflow': outflow})
+
+    results = {'emission_total': emissions['emission_total'], 'material_inflow': inflow, 'material_outflow': outflow}
+    return {name: results[name] for name in outputs}
+
+def preload(config, distributions):
+    """Load the inputs & floor area before a pool of processes is started: forked processes inherit them."""
+    if multiprocessing.get_start_method() == 'fork':
+        get_floor_area(config, get_inputs(config))
+        if distributions.get('material_intensity') == ('triangular',):
+            get_intensity_range(config)
+
+def monte_carlo(config, draws, distributions = None, seed = 0, batch = 8, processes = None, outputs = ('emission_total',)):
+    """
+    Run draws (number of draws) of the Monte Carlo analysis, in batches of draws on a pool of processes (processes = None: the number of cpus, 1: in this process).
+    distributions: dictionary of parameter name: distribution (see above), default_distributions if None.
+    Returns a dictionary with the outputs asked for (see run_draws), with all draws.
+    """
+    distributions = default_distributions if distributions is None else distributions
+    batches = [list(range(start, min(start + batch, draws))) for start in range(0, draws, batch)]
+    results = [None] * len(batches)
+    if processes == 1:
+        for number, draw_batch in enumerate(batches):
+            results[number] = run_draws(config, distributions, seed, draw_batch, outputs)
+    else:
+        preload(config, distributions)
+        with concurrent.futures.ProcessPoolExecutor(max_workers = processes) as pool:
+            futures = {pool.submit(run_draws, config, distributions, seed, draw_batch, outputs): number for number, draw_batch in enumerate(batches)}
+            for future in concurrent.futures.as_completed(futures):
+                results[futures[future]] = future.result()
+    return {name: np.concatenate([result[name] for result in results]) for name in outputs}
+
+def draws_file(config):
+    """File of the total emissions of all draws (draw x region x year, .npy), next to config.emission_output."""
+    return os.path.splitext(config.file(config.emission_output))[0] + '_draws.npy'
+
+def argument_parser(description):
+    """Parser of the command line arguments of the draws (also used by ensemble.py)."""
+    parser = argparse.ArgumentParser(description = description)
+    parser.add_argument('--draws', type = int, default = 1000, help = 'number of draws')
+    parser.add_argument('--seed', type = int, default = 0, help = 'seed of the random generators')
+    parser.add_argument('--batch', type = int, default = 8, help = 'number of draws per batch (about 120 MB of memory per draw & process)')
+    parser.add_argument('--processes', type = int, help = 'number of processes (default: the number of cpus)')
+    parser.add_argument('--lifetime_sd', type = float, default = 0.1, help = 'relative standard deviation of the lifetime shape & scale (normal)')
+    parser.add_argument('--intensity_range', type = float, default = 0.2, help = 'relative range of the material intensities (triangular)')
+    parser.add_argument('--intensity_files', action = 'store_true', help = 'sample the material intensities between the _low, _median & _high material files instead')
+    parser.add_argument('--rate_range', type = float, default = 0.1, help = 'relative range of the recovery & reuse rates (uniform)')
+    parser.add_argument('--path', help = 'the GloBUME-main folder (default: the folder containing the GloBUME package)')
+    for flag in ['flag_alpha', 'flag_ExpDec', 'flag_Normal']:
+        parser.add_argument('--' + flag, type = int, default = 0)
+    parser.add_argument('--dsm_backend', default = 'numpy', help = "backend of the dynamic stock model ('numpy' or 'numba')")
+    return parser
+
+def arguments_settings(args):
+    """The Config & the distributions of the parsed command line arguments."""
+    config = Config(path = args.path, flag_alpha = args.flag_alpha, flag_ExpDec = args.flag_ExpDec, flag_Normal = args.flag_Normal, dsm_backend = args.dsm_backend)
+    distributions = copy.deepcopy(default_distributions)
+    distributions['lifetime_shape'] = distributions['lifetime_scale'] = ('normal', args.lifetime_sd)
+    distributions['material_intensity'] = ('triangular',) if args.intensity_files else ('triangular', args.intensity_range, args.intensity_range)
+    distributions['recovery_rate'] = distributions['reuse_rate'] = ('uniform', args.rate_range)
+    return config, distributions
+
+def main(arguments = None):
+    args = argument_parser('Monte Carlo analysis of GloBUME: samples the lifetimes, material intensities & recovery/reuse rates, writes the total emissions of all draws.').parse_args(arguments)
+    config, distributions = arguments_settings(args)
+
+    start = time.time()
+    results = monte_carlo(config, args.draws, distributions, args.seed, args.batch, args.processes)
+    file = draws_file(config)
+    os.makedirs(os.path.dirname(file), exist_ok = True)
+    np.save(file, results['emission_total'])
+    print(args.draws, 'draws done in', round(time.time() - start, 1), 's, written to', file)
+
+if __name__ == '__main__':
+    main()
+
+# The end.
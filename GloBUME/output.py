@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+Output of GloBUME (material inflow & outflow, emissions)
+
+The material output has the dimensions flow x building type (type & area) x material x region x year, the emission output region x year.
+They are written in one or more formats (Config.output_format):
+    'csv'     : one row per flow, building type, area, material & region (in this order) and one column per year (the emission output one row per region)
+    'csv.gz'  : the same table as gzip-compressed csv
+    'parquet' : the same table as parquet file (requires pyarrow, fastparquet is not supported)
+    'hdf5'    : the array as HDF5 dataset, with the labels of the dimensions as dimension scales (requires h5py)
+    'netcdf'  : the array as NetCDF-4 variable, with the dimensions & labels as coordinates (requires netCDF4, or h5netcdf)
+The file names are those of the Config (config.material_output & config.emission_output) with the extension of the format.
+Config.output_dtype sets the float type of the output (e.g. 'float32' for archives), None keeps float64.
+
+The outputs are written block by block (one region x year block per flow, building type & material), each block is appended to the file
+& released before the next one is made, so the memory use of the writers does not grow with the number of building types, materials or years.
+The hdf5 & netcdf files are created with their full shape first, the blocks fill one chunk each.
+
+"""
+
+import gzip
+import itertools
+import os
+import numpy as np
+import pandas as pd
+
+from .config import regions, years, materials, buildings, building_names
+
+try:
+    import h5py
+except ImportError: # only needed for the hdf5 output
+    h5py = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError: # only needed for the parquet output
+    pyarrow = None
+
+try:
+    import netCDF4 as netcdf
+except ImportError: # only needed for the netcdf output, the same files are written with h5netcdf if netCDF4 is not installed
+    try:
+        import h5netcdf.legacyapi as netcdf
+    except ImportError:
+        netcdf = None
+
+tag = ['inflow', 'outflow']
+
+parquet_rows = 4096     # maximum number of rows of a row group of the parquet output (the blocks are collected up to this number of rows)
+
+class Output(object):
+    """
+    One output of the model, made of region x year blocks (the last 2 dimensions):
+        dims   : the names of the dimensions
+        coords : the labels of each dimension
+        labels : name: (dimension, labels), additional labels along a dimension (e.g. the type & area of the building types)
+        block  : function returning the region x year array of a block, from the positions along the leading dimensions (a tuple)
+        table  : function returning the rows (DataFrame) of a block in the csv output, from the positions & the array of the block
+        dtype  : float type of the written values (None = unchanged)
+    """
+    def __init__(self, name, dims, coords, labels, block, table, dtype = None):
+        self.name = name
+        self.dims = dims
+        self.coords = coords
+        self.labels = labels
+        self.block = block
+        self.table = table
+        self.dtype = dtype
+
+    @property
+    def shape(self):
+        return tuple(len(self.coords[dim]) for dim in self.dims)
+
+    def astype(self, dtype):
+        """The same output with values of another float type (None = unchanged)."""
+        return Output(self.name, self.dims, self.coords, self.labels, self.block, self.table, dtype)
+
+    def blocks(self):
+        """Generator of the blocks (positions, region x year array), in the order of the dimensions."""
+        for index in itertools.product(*[range(length) for length in self.shape[:-2]]):
+            values = self.block(index)
+            if self.dtype is not None:
+                values = values.astype(self.dtype, copy = False)
+            yield index, values
+
+    def tables(self):
+        """Generator of the rows of the csv output (DataFrame), block by block."""
+        for index, values in self.blocks():
+            yield self.table(index, values)
+
+    def frame(self):
+        """The whole csv output as one DataFrame."""
+        return pd.concat(self.tables())
+
+    def array(self):
+        """The whole output as one array."""
+        values = np.empty(self.shape, dtype = self.dtype or float)
+        for index, block in self.blocks():
+            values[index] = block
+        return values
+
+# rows of one flow, building type & material (one row per region), with columns to identify material, area & appartment type. Only for csv output
+def material_table(index, values, columns = years):
+    flow, building, material = index
+    output = pd.DataFrame(values, index = list(range(1, regions + 1)), columns = columns)
+    output.insert(0, 'material', materials[material])
+    output.insert(0, 'area', buildings[building][1])
+    output.insert(0, 'type', buildings[building][0])
+    output.insert(0, 'flow', tag[flow])
+    return output
+
+def emission_table(index, values, columns = years):
+    return pd.DataFrame(values, index = pd.Index(range(1, regions + 1), name = 'Region'), columns = columns)
+
+def material_output(material_flows, name = 'material_output', columns = years):
+    """Output of the material inflow & outflow (flow x building type x material x region x year), columns: the years of the arrays."""
+    return Output(name, ['flow', 'building', 'material', 'region', 'year'],
+                  {'flow': tag, 'building': building_names, 'material': materials, 'region': list(range(1, regions + 1)), 'year': columns},
+                  {'type': ('building', [building for building, area in buildings]), 'area': ('building', [area for building, area in buildings])},
+                  lambda index: material_flows[tag[index[0]]][index[1], index[2]], lambda index, values: material_table(index, values, columns))
+
+def emission_output(emissions, name = 'GHG_total', columns = years):
+    """Output of the total emissions (region x year), columns: the years of the array."""
+    return Output(name, ['region', 'year'], {'region': list(range(1, regions + 1)), 'year': columns}, {},
+                  lambda index: emissions['emission_total'], lambda index, values: emission_table(index, values, columns))
+
+def material_output_frame(material_flows):
+    return material_output(material_flows).frame()
+
+def emission_output_frame(emissions):
+    return emission_output(emissions).frame()
+
+def write_material_output(config, material_flows):
+    """Write the material inflow & outflow to config.material_output, in the format(s) of config.output_format."""
+    write_output(config, material_output(material_flows), config.material_output)
+
+def write_emission_output(config, emissions):
+    """Write the total emissions by region & year to config.emission_output, in the format(s) of config.output_format."""
+    write_output(config, emission_output(emissions), config.emission_output)
+
+def write_output(config, output, name):
+    """Write an output to the file name (relative to the GloBUME-main folder, the extension is replaced by that of the format) in all formats of the config."""
+    output = output.astype(config.output_dtype)
+    formats = [config.output_format] if isinstance(config.output_format, str) else config.output_format
+    for output_format in formats:
+        if output_format not in writers:
+            raise ValueError('unknown output format ' + str(output_format) + ', choose from ' + ', '.join(writers))
+        extension, writer = writers[output_format]
+        file = output_file(config.file(name), extension)
+        make_folder(file)
+        writer(output, file)
+
+def output_file(file, extension):
+    """File name with the extension of an output format (.csv is replaced, e.g. material_output.csv -> material_output.parquet)."""
+    base, old_extension = os.path.splitext(file)
+    return (base if old_extension == '.csv' else file) + extension
+
+def make_folder(file):
+    folder = os.path.dirname(file)
+    if folder != '' and not os.path.isdir(folder):
+        os.makedirs(folder)
+
+# the writers of the output formats, by format: (extension, function writing an Output to a file)
+def csv_writer(output, file):
+    with open(file, 'w', newline = '') as f:
+        append_csv(output, f)
+
+def csv_gz_writer(output, file):
+    with gzip.open(file, 'wt', newline = '') as f:
+        append_csv(output, f)
+
+def append_csv(output, f):
+    # the header with the first block, the other blocks are appended
+    for number, table in enumerate(output.tables()):
+        table.to_csv(f, header = number == 0)
+
+def parquet_writer(output, file):
+    if pyarrow is None:
+        raise ImportError('the parquet output requires pyarrow (fastparquet is not supported)')
+    writer = None
+    group = []
+    for table in itertools.chain(output.tables(), [None]):
+        if table is not None:
+            table.columns = [str(column) for column in table.columns]   # parquet only allows text column names
+            group.append(table)
+        if len(group) > 0 and (table is None or sum(len(rows) for rows in group) >= parquet_rows):
+            rows = pyarrow.Table.from_pandas(pd.concat(group))
+            if writer is None:
+                writer = pyarrow.parquet.ParquetWriter(file, rows.schema)
+            writer.write_table(rows)
+            group = []
+    if writer is not None: # no file for an output without blocks
+        writer.close()
+
+def hdf5_writer(output, file):
+    if h5py is None:
+        raise ImportError('the hdf5 output requires h5py')
+    with h5py.File(file, 'w') as f:
+        # one chunk per block
+        dataset = f.create_dataset(output.name, shape = output.shape, dtype = output.dtype or float, compression = 'gzip', chunks = (1,) * (len(output.dims) - 2) + output.shape[-2:])
+        for index, values in output.blocks():
+            dataset[index] = values
+        for number, dim in enumerate(output.dims):
+            scale = f.create_dataset(dim, data = scale_data(output.coords[dim]))
+            scale.make_scale(dim)
+            dataset.dims[number].attach_scale(scale)
+        for name, (dim, labels) in output.labels.items():
+            label = f.create_dataset(name, data = scale_data(labels))
+            label.make_scale(name)
+            dataset.dims[output.dims.index(dim)].attach_scale(label)
+
+def scale_data(labels):
+    if isinstance(labels[0], str):
+        return np.array(labels, dtype = h5py.string_dtype())
+    return np.array(labels)
+
+def netcdf_writer(output, file):
+    if netcdf is None:
+        raise ImportError('the netcdf output requires netCDF4 (or h5netcdf)')
+    with netcdf.Dataset(file, 'w') as f:
+        for dim in output.dims:
+            f.createDimension(dim, len(output.coords[dim]))
+            netcdf_labels(f, dim, dim, output.coords[dim])
+        for name, (dim, labels) in output.labels.items():
+            netcdf_labels(f, name, dim, labels)
+        # one chunk per block
+        variable = f.createVariable(output.name, np.dtype(output.dtype or float), tuple(output.dims), zlib = True, chunksizes = (1,) * (len(output.dims) - 2) + output.shape[-2:])
+        if len(output.labels) > 0:
+            variable.setncattr('coordinates', ' '.join(output.labels))   # the additional labels are coordinates, not data variables
+        for index, values in output.blocks():
+            variable[index] = values
+
+def netcdf_labels(f, name, dim, labels):
+    if isinstance(labels[0], str):
+        variable = f.createVariable(name, str, (dim,))
+        variable[:] = np.array(labels, dtype = object)
+    else:
+        variable = f.createVariable(name, np.array(labels).dtype, (dim,))
+        variable[:] = np.array(labels)
+
+writers = {'csv': ('.csv', csv_writer), 'csv.gz': ('.csv.gz', csv_gz_writer), 'parquet': ('.parquet', parquet_writer),
+           'hdf5': ('.h5', hdf5_writer), 'netcdf': ('.nc', netcdf_writer)}
+
+# The end.
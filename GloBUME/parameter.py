@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Time-dependent parameters stored as a base value & sparse year changes
+
+Most parameters (lifetimes, material intensities, reuse rates) are constant over the 340 years, others change in some years only
+(e.g. the emission factors every 5 years from 2020). A Parameter stores the values of the first year (base, e.g. building type x region)
+& the years in which the values change (changes, year: values from that year on), and is broadcast to ... x year when used as an array.
+A constant parameter is broadcast without copying (a read-only view).
+
+Parameters behave as arrays in calculations (e.g. outflow * inputs['recovery_rate'], inputs['lifetime_shape'][building]),
+np.asarray(parameter) returns the full ... x year array.
+
+"""
+
+import numpy as np
+
+from .config import years
+
+class Parameter(np.lib.mixins.NDArrayOperatorsMixin):
+    """
+    Parameter by ... x year (1721-2060): the values of the first year (base) & the changes in later years (year: values from that year on).
+    """
+    def __init__(self, base, changes = None):
+        self.base = np.asarray(base, dtype = float)
+        self.changes = {} if changes is None else dict(changes)
+
+    @classmethod
+    def from_array(cls, values):
+        """Parameter of a full ... x year array (e.g. a wide csv-file), only the years in which the values change are stored."""
+        values = np.asarray(values, dtype = float)
+        change = np.any((values[..., 1:] != values[..., :-1]) & ~(np.isnan(values[..., 1:]) & np.isnan(values[..., :-1])), axis = tuple(range(0, values.ndim - 1)))
+        return cls(values[..., 0].copy(), {int(years[0] + number + 1): values[..., number + 1].copy() for number in np.flatnonzero(change)})
+
+    @property
+    def shape(self):
+        return self.base.shape + (len(years),)
+
+    @property
+    def ndim(self):
+        return self.base.ndim + 1
+
+    @property
+    def dtype(self):
+        return self.base.dtype
+
+    def at(self, year):
+        """The values in a year."""
+        values = self.base
+        for change in sorted(self.changes):
+            if change <= year:
+                values = self.changes[change]
+        return values
+
+    def set(self, year, values, index = Ellipsis):
+        """A new Parameter with the values (of the selection index of the base, e.g. building type, region) set from the year on (e.g. a lifetime extension from 2030)."""
+        changes = {}
+        for change in self.changes:
+            changes[change] = self.changes[change].copy()
+            if change > year:
+                changes[change][index] = values
+        changed = self.at(year).copy()
+        changed[index] = values
+        if year <= years[0]:
+            return Parameter(changed, changes)
+        changes[year] = changed
+        return Parameter(self.base, changes)
+
+    def array(self):
+        """The full ... x year array (a read-only view if the parameter is constant)."""
+        if len(self.changes) == 0:
+            return np.broadcast_to(self.base[..., np.newaxis], self.shape)
+        change_years = sorted(self.changes)
+        values = np.stack([self.base] + [self.changes[year] for year in change_years], axis = -1)
+        return values[..., np.searchsorted(change_years, years, side = 'right')]    # position 0 is the base, 1 the first change, etc.
+
+    def __array__(self, dtype = None, copy = None):
+        values = self.array()
+        return values if dtype is None else values.astype(dtype)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        inputs = [value.array() if isinstance(value, Parameter) else value for value in inputs]
+        return getattr(ufunc, method)(*inputs, **kwargs)
+
+    def __getitem__(self, key):
+        return self.array()[key]
+
+    def __repr__(self):
+        return 'Parameter(shape = ' + str(self.shape) + ', changes in ' + str(len(self.changes)) + ' years)'
+
+# The end.
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+Weighted regression of the commercial floor area per capita on the service value added per capita (Gompertz & Exponential Decay curves)
+
+The curves of the commercial floor area (m2/cap) as a function of the service value added per capita (x, US-$/cap, 2016 PPP):
+    Gompertz : a * exp(-b * exp(-c / 1000 * x))
+    ExpDec   : a - b * exp(-c / 1000 * x)
+are fitted to the data of all commercial categories at once: services (the total, column 'All' of the parameter files), offices, retail,
+hotels & other (government), from the files data_<category>_PPP.csv in files_floor_area/files_commercial (no header; columns: x, m2/cap,
+population (thousands), GDP per capita). The residuals are weighted by sigma (the population for services, the GDP per capita for the
+other categories: sigma is 30% of the weighted mean m2/cap for small values, decreasing to 1.5% for large values), or not weighted.
+Each curve is fitted by bounded least squares (trust region reflective) with the analytic Jacobian of the residuals.
+    Gompertz : 0 <= a <= max(m2/cap) (x 1.1 for the alpha variant, services only, see Config.flag_alpha), 0 <= b <= 20, 0.01 <= c <= 1
+    ExpDec   : -10 <= a <= max(m2/cap), 0 <= b <= 100, 0 <= c <= 20
+
+The fitted parameters are written to the input files of the model (files_floor_area/files_commercial):
+    Gompertz_parameters.csv, Gompertz_parameters_alpha.csv & ExpDec_parameters.csv (only the column 'All' is used by the model, with flag_ExpDec = 1)
+and the goodness of fit of all fits (R^2, weighted X^2 & the share of the current floor area reproduced) to regression_fits.csv.
+With --plot, the fits are plotted to <category>_fit.png (Gompertz), services_fit_sensitivity_alpha.png & <category>_fit_sensitivity_Expdec.png.
+
+Command line, from the GloBUME-main folder:
+    python -m GloBUME.regression
+(the former scripts weighted_regression_Gompertz.py & weighted_regression_ExpDec.py in files_commercial run this command with --plot)
+
+"""
+
+import argparse
+import collections
+import os
+import numpy as np
+import pandas as pd
+from scipy import optimize
+
+from .config import Config
+
+try:
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+except ImportError: # only needed for the plots
+    plt = None
+
+# the commercial categories, with their column in the parameter files
+categories = collections.OrderedDict([('services', 'All'), ('offices', 'Office'), ('retail', 'Retail+'), ('other', 'Govt+'), ('hotels', 'Hotels+')])
+
+# folder of the data & the parameter files (relative to the GloBUME-main folder)
+commercial_folder = 'files_floor_area/files_commercial'
+
+# the curves: function of the parameters a, b & c & x returning the m2/cap & its derivatives by a, b & c, initial guess & bounds of a, b & c
+# (None: the maximum of the data, times alpha_fact)
+def gompertz(a, b, c, x):
+    decay = np.exp((-c / 1000) * x)
+    growth = np.exp(-b * decay)
+    return a * growth, [growth, -a * growth * decay, a * growth * b * decay * x / 1000]
+
+def expdec(a, b, c, x):
+    decay = np.exp((-c / 1000) * x)
+    return a - b * decay, [np.ones(np.shape(decay)), -decay, b * decay * x / 1000]
+
+curves = {'Gompertz': (gompertz, [25, 3.3, 0.07], [(0, None), (0, 20.0), (0.01, 1.0)]),
+          'ExpDec': (expdec, [8, 10, 0.015], [(-10.0, None), (0, 100.0), (0, 20.0)])}
+
+def data_file(category, folder = commercial_folder):
+    """The data file of a category, relative to the GloBUME-main folder."""
+    return os.path.join(folder, 'data_' + category + '_PPP.csv')
+
+def check_data(config, folder = commercial_folder):
+    """Raise a FileNotFoundError naming the data files of the categories that are missing (they are not part of the repository)."""
+    missing = [data_file(category, folder) for category in categories if not os.path.isfile(config.file(data_file(category, folder)))]
+    if missing:
+        raise FileNotFoundError('the regression needs the data files ' + ', '.join(missing) + ' in ' + config.path +
+                                ' (no header; columns: x, m2/cap, population, GDP per capita), add them or give their folder with --folder')
+
+def read_data(config, category, folder = commercial_folder):
+    """The data of a category: x (service value added per capita), y (m2/cap), population & GDP per capita."""
+    data = np.genfromtxt(config.file(data_file(category, folder)), delimiter = ',')
+    return {'x': data[:, 0], 'y': data[:, 1], 'pop': data[:, 2], 'gdp': data[:, 3]}
+
+def sigma(data, category):
+    """The standard deviation of the data points (the weights of the regression)."""
+    sigma_choice = data['pop'] if category == 'services' else data['gdp']  # population for services (all), GDP/cap for the 4 sub-categories
+    y_mean_weighted = np.sum(sigma_choice * data['y']) / np.sum(sigma_choice)
+    sig_max, sig_min = 0.3, 0.015
+    sig_max_value = 200000 if category == 'services' else 40000
+    return y_mean_weighted * np.maximum(sig_min, sig_max - ((sig_max - sig_min) / sig_max_value) * sigma_choice)
+
+def curve_bounds(curve, y, alpha_fact = 1.0):
+    """Lower & upper bounds of a, b & c of a curve for the data y."""
+    lower = np.array([low for low, high in curves[curve][2]])
+    upper = np.array([np.max(y) * alpha_fact if high is None else high for low, high in curves[curve][2]])
+    return lower, upper
+
+def fit(curve, data, sigma = None, alpha_fact = 1.0):
+    """Fit a curve ('Gompertz' or 'ExpDec') to the data (weighted by sigma if not None), returns the parameters a, b & c."""
+    function = curves[curve][0]
+    x, y = data['x'], data['y']
+    weight = 1 / (np.ones(len(x)) if sigma is None else sigma)
+    lower, upper = curve_bounds(curve, y, alpha_fact)
+
+    def residuals(parameters):
+        return (y - function(*parameters, x)[0]) * weight
+
+    def jacobian(parameters):
+        return -np.stack(function(*parameters, x)[1], axis = 1) * weight[:, np.newaxis]
+
+    # the initial guess, moved inside the bounds
+    guess = np.clip(curves[curve][1], lower + 1e-6 * (upper - lower), upper - 1e-6 * (upper - lower))
+    result = optimize.least_squares(residuals, guess, jac = jacobian, bounds = (lower, upper), method = 'trf', x_scale = 'jac', xtol = 1e-12, ftol = 1e-12, gtol = 1e-12)
+    return result.x
+
+def goodness_of_fit(curve, parameters, data, sigma):
+    """R^2 (not weighted), X^2 (weighted by sigma) & the share of the current floor area (population x m2/cap) reproduced by the curve (negative values count as 0)."""
+    y_fit = curves[curve][0](*parameters, data['x'])[0]
+    ss_res = np.sum((data['y'] - y_fit) ** 2)
+    ss_tot = np.sum((data['y'] - np.mean(data['y'])) ** 2)
+    return {'R2': 1 - ss_res / ss_tot, 'X2': np.sum(((data['y'] - y_fit) / sigma) ** 2),
+            'current_fit': np.sum(np.maximum(y_fit, 0) * data['pop']) / np.sum(data['y'] * data['pop'])}
+
+def fit_all(config, weighted = True, folder = commercial_folder):
+    """
+    Fit both curves to all categories (weighted & not weighted), and the Gompertz curve of services with the upper bound of a 10% higher (alpha variant).
+    Returns the parameter tables ('Gompertz', 'Gompertz_alpha' & 'ExpDec': a, b & c by column of the parameter files, from the weighted or
+    not weighted fits) & the table of all fits with their goodness of fit.
+    """
+    parameters = {name: pd.DataFrame(index = ['a', 'b', 'c'], columns = list(categories.values()), dtype = float) for name in ['Gompertz', 'Gompertz_alpha', 'ExpDec']}
+    fits = []
+    check_data(config, folder)
+    for category, column in categories.items():
+        data = read_data(config, category, folder)
+        data_sigma = sigma(data, category)
+        variants = [('Gompertz', 'Gompertz', 1.0), ('ExpDec', 'ExpDec', 1.0)] + ([('Gompertz', 'Gompertz_alpha', 1.1)] if category == 'services' else [])
+        for curve, name, alpha_fact in variants:
+            for weighting in ['weighted', 'unweighted']:
+                fitted = fit(curve, data, data_sigma if weighting == 'weighted' else None, alpha_fact)
+                fits.append(collections.OrderedDict([('curve', name), ('category', category), ('weighting', weighting), ('a', fitted[0]), ('b', fitted[1]), ('c', fitted[2])]))
+                fits[-1].update(goodness_of_fit(curve, fitted, data, data_sigma))
+                if (weighting == 'weighted') == weighted:
+                    parameters[name][column] = fitted
+    # the alpha variant only differs for services (the total)
+    for column in list(categories.values())[1:]:
+        parameters['Gompertz_alpha'][column] = parameters['Gompertz'][column]
+    return parameters, pd.DataFrame(fits)
+
+# the plots of the parameter tables: curve, categories plotted & addition to the file name <category><addition>.png
+plots = {'Gompertz': ('Gompertz', list(categories), '_fit.png'), 'Gompertz_alpha': ('Gompertz', ['services'], '_fit_sensitivity_alpha.png'),
+         'ExpDec': ('ExpDec', list(categories), '_fit_sensitivity_Expdec.png')}
+
+def plot_fits(config, name, parameters, folder = commercial_folder):
+    """
+    Plot the data & the fitted curve of each category of a parameter table ('Gompertz', 'Gompertz_alpha' or 'ExpDec', see fit_all), to
+    <category>_fit.png, services_fit_sensitivity_alpha.png & <category>_fit_sensitivity_Expdec.png.
+    """
+    if plt is None:
+        raise ImportError('the plots require matplotlib')
+    curve, plot_categories, file_addition = plots[name]
+    for category in plot_categories:
+        column = categories[category]
+        data = read_data(config, category, folder)
+        x = np.arange(0, int(np.max(data['x'])) + 1)
+        fig = plt.figure(figsize = (18.5, 10.5))
+        plt.scatter(data['x'], data['y'], s = 20, label = 'data')
+        plt.plot(x, curves[curve][0](*parameters[column], x)[0], color = 'blue', linewidth = 2, label = 'fit (' + curve + ')')
+        fig.suptitle('Development of per capita ' + category + ' floorspace demand (' + curve + ')', fontsize = 28)
+        plt.xlabel('SVA US-$ /cap (2016, PPP) / yr', fontsize = 25)
+        plt.ylabel('m2/cap ' + category + ' floorspace', fontsize = 25)
+        plt.legend(loc = 4)
+        fig.savefig(config.file(os.path.join(folder, category + file_addition)))
+        plt.close(fig)
+
+def write_parameters(config, parameters, folder = commercial_folder):
+    """Write the parameter tables to the input files of the model."""
+    for name, file in [('Gompertz', 'Gompertz_parameters.csv'), ('Gompertz_alpha', 'Gompertz_parameters_alpha.csv'), ('ExpDec', 'ExpDec_parameters.csv')]:
+        parameters[name].to_csv(config.file(os.path.join(folder, file)))
+
+def main(arguments = None):
+    parser = argparse.ArgumentParser(description = 'Fit the Gompertz & Exponential Decay curves of the commercial floor area of all categories & write the parameter files of the model.')
+    parser.add_argument('--path', help = 'the GloBUME-main folder (default: the folder containing the GloBUME package)')
+    parser.add_argument('--folder', default = commercial_folder, help = 'folder of the data_<category>_PPP.csv files & the parameter files, relative to the GloBUME-main folder')
+    parser.add_argument('--unweighted', action = 'store_true', help = 'write the parameters of the fits without weights')
+    parser.add_argument('--plot', action = 'store_true', help = 'plot the fits (requires matplotlib)')
+    args = parser.parse_args(arguments)
+
+    config = Config(path = args.path)
+    try:
+        check_data(config, args.folder)
+    except FileNotFoundError as error:
+        parser.error(str(error))
+    parameters, fits = fit_all(config, not args.unweighted, args.folder)
+    write_parameters(config, parameters, args.folder)
+    fits.to_csv(config.file(os.path.join(args.folder, 'regression_fits.csv')), index = False)
+    if args.plot:
+        for name in plots:
+            plot_fits(config, name, parameters[name], args.folder)
+    print(fits.to_string(index = False))
+
+if __name__ == '__main__':
+    main()
+
+# The end.
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Content-addressed cache of the results of the model stages
+
+The results of a stage (a dictionary of arrays) are stored in the cache folder as <stage>/<key>.npz, the key is a hash of
+everything the stage depends on: the inputs & flags it uses, the source code of its modules & the key(s) of the stage(s) before it.
+    floor_area : the population, floor area, housing type & SVA inputs, the Gompertz (& ExpDec) parameters, flag_ExpDec
+    stock      : one entry per building type, the floor area of the building type (by key of the floor area stage), its lifetimes, flag_Normal & dsm_backend
+    materials  : the keys of the stock of all building types, the material intensities
+    emissions  : the key of the materials stage, the recovery & reuse rates, the emission factors
+A stage is only computed (or loaded) if a later stage needs it, e.g. a scenario with other emission factors only loads the material flows.
+The least recently used entries are removed when the cache exceeds its maximum size.
+
+"""
+
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+
+import dynamic_stock_model
+
+from . import floor_area, historic_tail, stock, materials, emissions
+from .config import buildings
+from .parameter import Parameter
+
+# the inputs, settings & modules each stage depends on
+stage_inputs = {'floor_area': ['gompertz', 'expdec', 'sva_pc', 'floorspace', 'avg_m2_cap', 'housing_type', 'pop', 'rurpop', 'pop_1970', 'rurpop_1970', 'rurpop_1980', 'maximum_rurpop', 'hist_pop'],
+                'stock': ['lifetime_shape', 'lifetime_scale'],
+                'materials': ['material_intensity'],
+                'emissions': ['recovery_rate', 'reuse_rate', 'emission_primary_per_kg', 'emission_secondary_per_kg']}
+stage_settings = {'floor_area': ['flag_ExpDec'], 'stock': ['flag_Normal', 'dsm_backend'], 'materials': [], 'emissions': []}
+stage_modules = {'floor_area': [floor_area, historic_tail], 'stock': [stock, dynamic_stock_model], 'materials': [materials], 'emissions': [emissions]}
+
+def update_hash(sha1, value):
+    """Add a value (array, DataFrame, number or text) to a hash."""
+    if isinstance(value, pd.DataFrame):
+        sha1.update(repr((list(value.columns), list(value.index))).encode())
+        value = np.asarray(value, dtype = float)
+    if isinstance(value, (np.ndarray, np.generic, Parameter)):
+        value = np.asarray(value)
+        sha1.update(repr((value.dtype.str, value.shape)).encode())
+        sha1.update(np.ascontiguousarray(value).view(np.uint8).data)
+    else:
+        sha1.update(repr(value).encode())
+
+def source_hash(modules):
+    sha1 = hashlib.sha1()
+    for module in modules:
+        with open(module.__file__, 'rb') as f:
+            sha1.update(f.read())
+    return sha1.hexdigest()
+
+def stage_key(stage, config, values, upstream = ()):
+    """Key of a stage: hash of its settings, its source code, the values of the inputs it uses & the keys of the stages before it."""
+    sha1 = hashlib.sha1(stage.encode())
+    sha1.update(source_hash(stage_modules[stage]).encode())
+    for setting in stage_settings[stage]:
+        update_hash(sha1, getattr(config, setting))
+    for value in values:
+        update_hash(sha1, value)
+    for key in upstream:
+        sha1.update(key.encode())
+    return sha1.hexdigest()
+
+def stage_keys(config, inputs):
+    """Keys of all stages of a configuration, returns a dictionary with the key of each stage (a list with the key of each building type for the stock)."""
+    keys = {'floor_area': stage_key('floor_area', config, [inputs[name] for name in stage_inputs['floor_area']])}
+    keys['stock'] = [stage_key('stock', config, [building] + [inputs[name][building] for name in stage_inputs['stock']], [keys['floor_area']]) for building in range(0, len(buildings))]
+    keys['materials'] = stage_key('materials', config, [inputs[name] for name in stage_inputs['materials']], keys['stock'])
+    keys['emissions'] = stage_key('emissions', config, [inputs[name] for name in stage_inputs['emissions']], [keys['materials']])
+    return keys
+
+class StageCache(object):
+    """
+    Store of the stage results in the folder path, with a maximum size (bytes).
+    """
+    def __init__(self, path, max_size):
+        self.path = path
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def file(self, stage, key):
+        return os.path.join(self.path, stage, key + '.npz')
+
+    def get(self, stage, key):
+        """The results (dictionary of arrays) of a stage, None if not in the cache."""
+        file = self.file(stage, key)
+        try:
+            with np.load(file) as f:
+                results = {name: f[name] for name in f.files}
+            os.utime(file)      # most recently used
+        except (OSError, ValueError):   # not in the cache (or removed by another process)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return results
+
+    def put(self, stage, key, results):
+        """Store the results of a stage & remove the least recently used entries if the cache is too large."""
+        if sum(np.asarray(value).nbytes for value in results.values()) > self.max_size:
+            return
+        file = self.file(stage, key)
+        # write to a temporary file first & replace, so parallel runs never read a partly written file
+        temporary = file + '.' + str(os.getpid()) + '.tmp.npz'
+        os.makedirs(os.path.dirname(file), exist_ok = True)
+        np.savez(temporary, **results)
+        os.replace(temporary, file)
+        self.evict()
+
+    def evict(self):
+        """Remove the least recently used entries until the cache is within its maximum size."""
+        entries = []
+        for root, dirs, names in os.walk(self.path):
+            for name in names:
+                if name.endswith('.npz') and not name.endswith('.tmp.npz'):
+                    try:
+                        stat = os.stat(os.path.join(root, name))
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, os.path.join(root, name)))
+        size = sum(entry[1] for entry in entries)
+        for mtime, entry_size, file in sorted(entries):
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(file)
+            except OSError:
+                pass
+            size -= entry_size
+
+# one cache per cache folder, shared by all runs in a process
+caches = {}
+
+def stage_cache(config):
+    """The StageCache of a configuration (None if config.stage_cache is None)."""
+    if config.stage_cache is None:
+        return None
+    path = os.path.abspath(config.file(config.stage_cache))
+    if path not in caches:
+        caches[path] = StageCache(path, config.stage_cache_size)
+    caches[path].max_size = config.stage_cache_size
+    return caches[path]
+
+# The end.
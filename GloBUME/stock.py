@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Floor area inflow & outflow (in millions of m2), from the floor area stock & the lifetimes by building type, region & cohort
+
+The stock-driven dynamic stock model is solved for all regions of a building type at once (see DynamicStockModelBatch in dynamic_stock_model.py).
+
+"""
+
+import numpy as np
+import pandas as pd
+
+import dynamic_stock_model
+from dynamic_stock_model import DynamicStockModelBatch as DSMBatch
+
+from .config import years
+
+# define a function for calculating the floor area inflow and outflow
+# shape & scale: lifetime parameters (region x cohort), stock: region x year
+# the outflow by cohort is returned as a dense float array of region x year x cohort (26 x 340 x 340), not as a labelled DataFrame
+def inflow_outflown(shape, scale, stock, flag_Normal, backend = 'numpy', cache = True):
+    length = stock.shape[1]     # length is the number of years in the entire period
+
+    if flag_Normal == 0:
+        lt = {'Type': 'Weibull', 'Shape': np.array(shape, dtype = float), 'Scale': np.array(scale, dtype = float)}
+    else:
+        lt = {'Type': 'FoldNorm', 'Mean': np.array(shape, dtype = float), 'StdDev': np.array(scale, dtype = float)} # shape & scale list are actually Mean & StDev here
+
+    # survival tables by region: through the shared cache, where identical lifetimes (e.g. across building types or regions) share one table,
+    # computed once per run, or directly for lifetimes that are (almost) never repeated (e.g. sampled), without evicting the tables of the model runs
+    sf_table = dynamic_stock_model.sf_cache.get if cache else dynamic_stock_model.compute_sf_array
+    sf = np.stack([sf_table({key: value if key == 'Type' else value[region] for key, value in lt.items()}, length) for region in range(0, stock.shape[0])])
+
+    # solve the stock-driven model for all regions at once (region x year stock, region x year x cohort survival tables)
+    DSMforward = DSMBatch(t = np.arange(0,length,1), s = np.array(stock, dtype = float), sf = sf, backend = backend)
+    # lazy scaling: the same results up to floating point rounding (see compute_stock_driven_model), without rescaling the future stock at each correction
+    out_sc, out_oc, out_i = DSMforward.compute_stock_driven_model(NegativeInflowCorrect = True, LazyScaling = True)
+
+    out_oc[out_oc < 0] = 0 # remove negative outflow, replace by 0
+
+    return out_i, out_oc
+
+# the same, together with the derivatives (forward mode) of the inflow & the outflow by cohort with respect to the lifetime shape & scale of each region
+# (the first dimension of the derivatives: 0 = shape, 1 = scale), see DynamicStockModelBatch.compute_stock_driven_model_tangent
+def inflow_outflown_tangent(shape, scale, stock, flag_Normal):
+    length = stock.shape[1]
+    if flag_Normal == 0:
+        lt = {'Type': 'Weibull', 'Shape': np.array(shape, dtype = float), 'Scale': np.array(scale, dtype = float)}
+        keys = ['Shape', 'Scale']
+    else:
+        lt = {'Type': 'FoldNorm', 'Mean': np.array(shape, dtype = float), 'StdDev': np.array(scale, dtype = float)}
+        keys = ['Mean', 'StdDev']
+    sf_tangent = dynamic_stock_model.compute_sf_tangent(lt, length)
+
+    DSMforward = DSMBatch(t = np.arange(0,length,1), s = np.array(stock, dtype = float), sf = dynamic_stock_model.sf_cache.get(lt, length))
+    out_sc, out_oc, out_i, out_sc_dot, out_oc_dot, out_i_dot = DSMforward.compute_stock_driven_model_tangent(sf_dot = np.stack([sf_tangent[key] for key in keys]),
+                                                                                                          NegativeInflowCorrect = True, LazyScaling = True)
+
+    out_oc_dot[:, out_oc < 0] = 0   # the negative outflow is replaced by 0 (constant)
+    out_oc[out_oc < 0] = 0
+
+    return out_i, out_oc, out_i_dot, out_oc_dot
+
+# labelled view (year x cohort) on the outflow by cohort of one region, e.g. outflow_cohort_frame(stock['outflow_cohort'][0], 20), only for inspection & output
+def outflow_cohort_frame(outflow_cohort, region):
+    return pd.DataFrame(outflow_cohort[region - 1], index = years, columns = years, copy = False)
+
+def compute_stock(config, inputs, floor_area):
+    """
+    Stock dynamics stage: returns a dictionary with the floor area 'inflow' (building type x region x year)
+    & the 'outflow_cohort' (building type x region x year x cohort), in millions of m2.
+    """
+    m2 = floor_area['m2']
+    inflow = np.zeros(m2.shape)
+    outflow_cohort = np.zeros(m2.shape + (m2.shape[2],))
+
+    # call the defined model to calculate inflow & outflow based on stock & lifetime
+    for building in range(0, m2.shape[0]):
+        inflow[building], outflow_cohort[building] = building_stock(config, inputs, floor_area, building)
+
+    return {'inflow': inflow, 'outflow_cohort': outflow_cohort}
+
+def building_stock(config, inputs, floor_area, building):
+    """Floor area inflow (region x year) & outflow by cohort (region x year x cohort) of one building type (position in config.buildings)."""
+    return inflow_outflown(inputs['lifetime_shape'][building], inputs['lifetime_scale'][building], floor_area['m2'][building], config.flag_Normal, config.dsm_backend)
+
+# The end.
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Scenario sweep: run GloBUME for all combinations of a grid of settings on a pool of processes
+
+A grid is a dictionary of option: values, with as values
+    a list of values of a Config setting, e.g. {'flag_Mean': [0, 1, 2, 3, 4]}
+    or a dictionary of named variants, each a dictionary of Config settings, e.g. the emission factor files:
+    {'emission_factor': {'GHG': {'emission_primary': ..., 'emission_secondary': ...}, 'CO2': {...}}}
+Each scenario (combination) writes its output to its own folder below the output folder, named by its key (e.g. flag_Mean=2,emission_factor=CO2),
+and the list of scenarios & their settings is written to scenarios.csv in the output folder.
+Scenarios with the same input files (see inputs.input_key) share the loaded inputs: they are loaded once per process
+(or once before the pool is started, if the processes are forked).
+
+Command line, from the GloBUME-main folder, e.g.:
+    python -m GloBUME.sweep --flag_Mean 0 1 2 3 4 --flag_ExpDec 0 1 --flag_Normal 0 1 --flag_alpha 0 1 --emission_factor GHG CO2 --processes 32
+
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import itertools
+import json
+import multiprocessing
+import os
+import time
+import pandas as pd
+
+from .config import Config
+from .inputs import load_inputs, input_key
+from .model import run
+
+# the inputs loaded in this process, by input key
+shared_inputs = {}
+
+def emission_factor_files(name):
+    """Config settings of the emission factor files of a set in files_emission_factor (e.g. 'GHG' or 'CO2')."""
+    return {'emission_primary': 'files_emission_factor/' + name + '_primary_per_kg.csv', 'emission_secondary': 'files_emission_factor/' + name + '_secondary_per_kg.csv'}
+
+def label(value):
+    """Label of a value in the key of a scenario (file names without folder & extension)."""
+    return os.path.splitext(os.path.basename(value))[0] if isinstance(value, str) else str(value)
+
+def scenario_grid(grid):
+    """List of all scenarios of a grid, each as (key, Config settings)."""
+    options = []
+    for option, values in grid.items():
+        if isinstance(values, dict):
+            options.append([(option + '=' + str(name), settings) for name, settings in values.items()])
+        else:
+            options.append([(option + '=' + label(value), {option: value}) for value in values])
+    scenarios = []
+    for combination in itertools.product(*options):
+        settings = {}
+        for name, option_settings in combination:
+            settings.update(option_settings)
+        scenarios.append((','.join(name for name, option_settings in combination), settings))
+    return scenarios
+
+def scenario_config(settings, key, output):
+    """Config of a scenario, the output is written to the folder output/key."""
+    settings = dict(settings)
+    folder = os.path.join(output, key)
+    settings['material_output'] = None if settings.get('material_output', '') is None else os.path.join(folder, 'material_output.csv')
+    settings['emission_output'] = os.path.join(folder, 'GHG_total.csv')
+    return Config(**settings)
+
+def get_inputs(config):
+    """The inputs of a configuration, loaded once per process."""
+    key = input_key(config)
+    if key not in shared_inputs:
+        shared_inputs[key] = load_inputs(config)
+    return shared_inputs[key]
+
+def run_scenario(settings, key, output):
+    """Run one scenario (in a process of the pool), returns the key, the total emissions (region x year) & the run time (s)."""
+    start = time.time()
+    config = scenario_config(settings, key, output)
+    results = run(config, get_inputs(config))
+    return key, results['emissions']['emission_total'], time.time() - start
+
+def sweep(grid, output = 'output_sweep', settings = None, processes = None, verbose = False):
+    """
+    Run all scenarios of a grid on a pool of processes (processes = None: the number of cpus, 1: in this process).
+    settings are the Config settings common to all scenarios, output is the output folder (relative to the GloBUME-main folder).
+    With verbose = True, the key & run time of each scenario are printed when it is done.
+    Returns an ordered dictionary of key: total emissions (region x year) of the scenarios.
+    """
+    settings = {} if settings is None else settings
+    scenarios = [(key, dict(settings, **scenario_settings)) for key, scenario_settings in scenario_grid(grid)]
+    configs = [scenario_config(scenario_settings, key, output) for key, scenario_settings in scenarios]
+
+    # list of the scenarios
+    table = pd.DataFrame([dict(scenario_settings, key = key) for key, scenario_settings in scenarios]).set_index('key')
+    folder = configs[0].file(output) if len(configs) > 0 else output
+    os.makedirs(folder, exist_ok = True)
+    table.to_csv(os.path.join(folder, 'scenarios.csv'))
+
+    results = collections.OrderedDict((key, None) for key, scenario_settings in scenarios)
+    if processes == 1:
+        for key, scenario_settings in scenarios:
+            key, results[key], seconds = run_scenario(scenario_settings, key, output)
+            if verbose:
+                print(key, 'done in', round(seconds, 1), 's')
+        return results
+
+    # forked processes inherit the inputs loaded before the pool is started
+    if multiprocessing.get_start_method() == 'fork':
+        for config in configs:
+            get_inputs(config)
+    with concurrent.futures.ProcessPoolExecutor(max_workers = processes) as pool:
+        futures = [pool.submit(run_scenario, scenario_settings, key, output) for key, scenario_settings in scenarios]
+        for future in concurrent.futures.as_completed(futures):
+            key, emission_total, seconds = future.result()
+            results[key] = emission_total
+            if verbose:
+                print(key, 'done in', round(seconds, 1), 's')
+    return results
+
+def main(arguments = None):
+    parser = argparse.ArgumentParser(description = 'Run GloBUME for all combinations of the settings given (a scenario grid) on a pool of processes.')
+    for flag in ['flag_alpha', 'flag_ExpDec', 'flag_Normal', 'flag_Mean']:
+        parser.add_argument('--' + flag, type = int, nargs = '+', help = 'values of ' + flag)
+    parser.add_argument('--emission_factor', nargs = '+', help = 'emission factor sets in files_emission_factor, e.g. GHG CO2')
+    for files in ['recovery_rate', 'reuse_rate']:
+        parser.add_argument('--' + files, nargs = '+', help = files + ' files (relative to the GloBUME-main folder)')
+    parser.add_argument('--grid', help = 'json file with a grid (see sweep.py), combined with the options above')
+    parser.add_argument('--path', help = 'the GloBUME-main folder (default: the folder containing the GloBUME package)')
+    parser.add_argument('--output', default = 'output_sweep', help = 'output folder (relative to the GloBUME-main folder)')
+    parser.add_argument('--processes', type = int, help = 'number of processes (default: the number of cpus)')
+    parser.add_argument('--dsm_backend', default = 'numpy', help = "backend of the dynamic stock model ('numpy' or 'numba')")
+    parser.add_argument('--output_format', nargs = '+', default = ['csv'], help = 'output format(s), see output.py')
+    parser.add_argument('--stage_cache', help = 'folder of the cache of the stage results (see stage_cache.py), e.g. stage_cache, to reuse the unchanged stages across scenarios & sweeps')
+    parser.add_argument('--no_material_output', action = 'store_true', help = 'only write the emission output')
+    args = parser.parse_args(arguments)
+
+    grid = collections.OrderedDict()
+    if args.grid is not None:
+        with open(args.grid) as f:
+            grid.update(json.load(f, object_pairs_hook = collections.OrderedDict))
+    for option in ['flag_alpha', 'flag_ExpDec', 'flag_Normal', 'flag_Mean', 'recovery_rate', 'reuse_rate']:
+        if getattr(args, option) is not None:
+            grid[option] = getattr(args, option)
+    if args.emission_factor is not None:
+        grid['emission_factor'] = collections.OrderedDict((name, emission_factor_files(name)) for name in args.emission_factor)
+
+    settings = {'path': args.path, 'dsm_backend': args.dsm_backend, 'output_format': args.output_format, 'stage_cache': args.stage_cache}
+    if args.no_material_output:
+        settings['material_output'] = None
+    start = time.time()
+    results = sweep(grid, args.output, settings, args.processes, verbose = True)
+    print(len(results), 'scenarios done in', round(time.time() - start, 1), 's')
+
+if __name__ == '__main__':
+    main()
+
+# The end.
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""
+Test configuration: the tests import dynamic_stock_model & the GloBUME package from the GloBUME-main folder.
+The fixtures give a Config writing its output to a temporary folder (not to the output folders of the repository) & its inputs.
+
+Run from the GloBUME-main folder:
+    python -m pytest tests
+
+"""
+
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from GloBUME.config import Config
+from GloBUME.inputs import load_inputs
+
+def make_config(folder, **settings):
+    """Config with the input cache & the output in a temporary folder (only the emission output, unless given in settings)."""
+    defaults = {'input_cache': os.path.join(str(folder), 'input_cache'), 'material_output': None, 'emission_output': os.path.join(str(folder), 'output_emission', 'GHG_total.csv')}
+    defaults.update(settings)
+    return Config(**defaults)
+
+@pytest.fixture(scope = 'session')
+def config(tmp_path_factory):
+    return make_config(tmp_path_factory.mktemp('globume'))
+
+@pytest.fixture(scope = 'session')
+def inputs(config):
+    return load_inputs(config)
+
+# The end.
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Derivatives of the total emissions: the forward pass gives the emissions of run(), and the Jacobian blocks equal central finite differences
+of the model (a parameter of one building type (x material) & region changed in all years), 0 for the other regions.
+
+"""
+
+import numpy as np
+import pytest
+
+from GloBUME.derivatives import derivatives
+from GloBUME.model import run
+from GloBUME.monte_carlo import run_samples
+from GloBUME.parameter import Parameter
+
+@pytest.fixture(scope = 'module')
+def forward(config, inputs):
+    return derivatives(config, inputs)
+
+def changed(parameter, index, delta):
+    """The Parameter with the values of the index (of the base) changed by delta in all years."""
+    base = parameter.base.copy()
+    base[index] += delta
+    changes = {}
+    for year, values in parameter.changes.items():
+        changes[year] = values.copy()
+        changes[year][index] += delta
+    return Parameter(base, changes)
+
+def test_emissions(config, inputs, forward):
+    np.testing.assert_allclose(forward['emission_total'], run(config, inputs)['emissions']['emission_total'], rtol = 1e-13)
+    assert forward['jacobian']['lifetime_scale'].shape == inputs['lifetime_scale'].shape
+    assert forward['jacobian']['material_intensity'].shape == inputs['material_intensity'].shape
+
+@pytest.mark.parametrize('name, index', [('lifetime_shape', (0, 4)), ('lifetime_scale', (8, 3)), ('material_intensity', (8, 2, 3)),
+                                         ('recovery_rate', (1, 0, 10)), ('emission_primary_per_kg', (4, 1, 19))])
+def test_jacobian(config, inputs, forward, name, index):
+    region = index[-1]
+    h = 1e-5 * max(abs(inputs[name].base[index]), 1e-3)
+    results = run_samples(config, inputs, [{name: changed(inputs[name], index, h)}, {name: changed(inputs[name], index, -h)}])['emission_total']
+    difference = (results[0] - results[1]) / (2 * h)
+    assert np.all(np.delete(difference, region, axis = 0) == 0)    # the other regions do not depend on the parameter
+    np.testing.assert_allclose(forward['jacobian'][name][index], difference[region], rtol = 1e-5, atol = 1e-6 * np.abs(difference[region]).max())
+
+# The end.
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+Parity of the survival tables of compute_sf_array & of the stock-driven models built on them against the baseline
+(per-cohort survival table as in the original compute_sf), for all lifetime types with & without the negative inflow correction,
+the survival table cache, the batch of stock-driven models, the lazy scaling of the negative inflow correction & the numba backend.
+The derivatives of the survival tables & of the stock-driven model (forward mode) equal central finite differences.
+
+"""
+
+import warnings
+import numpy as np
+import pytest
+import scipy.stats
+
+import dynamic_stock_model
+from dynamic_stock_model import DynamicStockModel as DSM, DynamicStockModelBatch as DSMBatch
+
+NoofYears = 60
+SwitchTime = 21 # first year of the stock-driven approach of compute_stock_driven_model_initialstock (counted from 1)
+
+rtol, atol = 1e-8, 1e-8
+
+# lifetimes by type, changing by age-cohort (some cohorts with a lifetime of 0)
+cohorts = np.arange(0, NoofYears)
+lifetimes = {'Weibull': {'Type': 'Weibull', 'Shape': np.where(cohorts == 5, 0, 1.9 + 0.01 * cohorts), 'Scale': 25 + 0.2 * cohorts},
+             'Normal': {'Type': 'Normal', 'Mean': np.where(cohorts == 5, 0, 20 + 0.2 * cohorts), 'StdDev': 6 + 0.05 * cohorts},
+             'FoldedNormal': {'Type': 'FoldedNormal', 'Mean': np.where(cohorts == 5, 0, 20 + 0.2 * cohorts), 'StdDev': 6 + 0.05 * cohorts},
+             'LogNormal': {'Type': 'LogNormal', 'Mean': np.where(cohorts == 5, 0, 20 + 0.2 * cohorts), 'StdDev': 6 + 0.05 * cohorts}}
+
+backends = ['numpy', 'numba']
+
+def reference_sf(lt):
+    """Survival table of the original compute_sf, one scipy call per age-cohort."""
+    sf = np.zeros((NoofYears, NoofYears))
+    for m in range(0, NoofYears):
+        Age = np.arange(0, NoofYears - m)
+        if lt['Type'] == 'Weibull':
+            if lt['Shape'][m] != 0:
+                sf[m::, m] = scipy.stats.weibull_min.sf(Age, c = lt['Shape'][m], loc = 0, scale = lt['Scale'][m])
+        elif lt['Mean'][m] != 0:
+            if lt['Type'] == 'Normal':
+                sf[m::, m] = scipy.stats.norm.sf(Age, loc = lt['Mean'][m], scale = lt['StdDev'][m])
+            elif lt['Type'] == 'FoldedNormal':
+                sf[m::, m] = scipy.stats.foldnorm.sf(Age, lt['Mean'][m] / lt['StdDev'][m], 0, scale = lt['StdDev'][m])
+            elif lt['Type'] == 'LogNormal':
+                LT_LN = np.log(lt['Mean'][m] / np.sqrt(1 + lt['Mean'][m] * lt['Mean'][m] / (lt['StdDev'][m] * lt['StdDev'][m])))
+                SG_LN = np.sqrt(np.log(1 + lt['Mean'][m] * lt['Mean'][m] / (lt['StdDev'][m] * lt['StdDev'][m])))
+                sf[m::, m] = scipy.stats.lognorm.sf(Age, s = SG_LN, loc = 0, scale = np.exp(LT_LN))
+    return sf
+
+def stock(scale = 1.0):
+    """A stock that grows & then drops, so that the stock-driven model yields negative inflows without the correction."""
+    years = np.arange(0, NoofYears)
+    return scale * (100 + 50 * np.tanh((years - 15) / 5) - 90 * (years >= 40) + 0.5 * np.maximum(years - 40, 0))
+
+def declining_stock():
+    """A stock that declines for 20 years, so that the older age-cohorts go through many negative inflow corrections."""
+    s = stock()
+    s[40:] = s[39] * 0.93 ** np.arange(1, NoofYears - 39)
+    return s
+
+def initial_stock():
+    """Age structure of the stock at the end of year SwitchTime - 1."""
+    return np.linspace(1, 5, SwitchTime - 1)
+
+def stock_driven(lt, NegativeInflowCorrect, LazyScaling = False, sf = None, s = None, backend = 'numpy'):
+    model = DSM(t = np.arange(0, NoofYears), s = stock() if s is None else s, lt = lt, sf = sf, backend = backend)
+    return model.compute_stock_driven_model(NegativeInflowCorrect = NegativeInflowCorrect, LazyScaling = LazyScaling)
+
+def stock_driven_initialstock(lt, NegativeInflowCorrect, sf = None, backend = 'numpy'):
+    s = stock()
+    s[0:SwitchTime - 1] = 0
+    model = DSM(t = np.arange(0, NoofYears), s = s, lt = lt, sf = sf, backend = backend)
+    return model.compute_stock_driven_model_initialstock(initial_stock(), SwitchTime, NegativeInflowCorrect = NegativeInflowCorrect)
+
+def assert_results_close(results, expected):
+    for result, reference in zip(results, expected): # s_c, o_c & i
+        np.testing.assert_allclose(result, reference, rtol = rtol, atol = atol)
+
+def assert_results_equal(results, expected):
+    for result, reference in zip(results, expected): # s_c, o_c & i
+        np.testing.assert_array_equal(result, reference)
+
+@pytest.fixture(autouse = True)
+def no_fallback_warning():
+    # the numba backend falls back to numpy (with a warning) if numba is not installed, the comparison still holds
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        yield
+
+@pytest.mark.parametrize('lifetime', list(lifetimes))
+def test_survival_table(lifetime):
+    lt = lifetimes[lifetime]
+    np.testing.assert_allclose(dynamic_stock_model.compute_sf_array(lt, NoofYears), reference_sf(lt), rtol = 1e-12, atol = 1e-14)
+
+@pytest.mark.parametrize('lifetime', list(lifetimes))
+def test_survival_table_stack(lifetime):
+    # parameters with leading dimensions (2 x 3 x age-cohort) yield a 2 x 3 stack of survival tables in one call
+    lt = lifetimes[lifetime]
+    factors = np.linspace(0.8, 1.2, 6).reshape(2, 3)
+    lt_stack = {ThisKey: (Par if ThisKey == 'Type' else np.multiply.outer(factors, Par)) for ThisKey, Par in lt.items()}
+    sf = dynamic_stock_model.compute_sf_array(lt_stack, NoofYears)
+    assert sf.shape == (2, 3, NoofYears, NoofYears)
+    for index in np.ndindex(2, 3):
+        lt_index = {ThisKey: (Par if ThisKey == 'Type' else Par[index]) for ThisKey, Par in lt_stack.items()}
+        np.testing.assert_allclose(sf[index], reference_sf(lt_index), rtol = 1e-12, atol = 1e-14)
+
+def test_survival_function_cache():
+    cache = dynamic_stock_model.SurvivalFunctionCache(maxsize = 2)
+    sf = cache.get(lifetimes['Weibull'], NoofYears)
+    np.testing.assert_array_equal(sf, dynamic_stock_model.compute_sf_array(lifetimes['Weibull'], NoofYears))
+    assert sf.flags.writeable is False
+    # the parameters are compared by value: equal copies share the table, other lifetimes do not
+    assert cache.get({ThisKey: (Par if ThisKey == 'Type' else Par.copy()) for ThisKey, Par in lifetimes['Weibull'].items()}, NoofYears) is sf
+    assert cache.get(lifetimes['Normal'], NoofYears) is not sf
+    assert (cache.hits, cache.misses) == (1, 2)
+    # least recently used tables are evicted beyond maxsize
+    cache.get(lifetimes['Weibull'], NoofYears)
+    cache.get(lifetimes['LogNormal'], NoofYears) # evicts Normal
+    assert len(cache.tables) == 2
+    assert cache.get(lifetimes['Weibull'], NoofYears) is sf
+    cache.get(lifetimes['Normal'], NoofYears)
+    assert (cache.hits, cache.misses) == (3, 4)
+    cache.clear()
+    assert len(cache.tables) == 0 and (cache.hits, cache.misses) == (0, 0)
+
+@pytest.mark.parametrize('lifetime', list(lifetimes))
+def test_negative_inflows(lifetime):
+    # without the correction, the stock of the tests yields negative inflows (the correction is exercised below)
+    assert stock_driven(lifetimes[lifetime], False)[2].min() < 0
+    assert stock_driven_initialstock(lifetimes[lifetime], False)[2].min() < 0
+
+@pytest.mark.parametrize('NegativeInflowCorrect', [False, True])
+@pytest.mark.parametrize('backend', backends)
+@pytest.mark.parametrize('lifetime', list(lifetimes))
+def test_stock_driven_model(lifetime, backend, NegativeInflowCorrect):
+    lt = lifetimes[lifetime]
+    expected = stock_driven(lt, NegativeInflowCorrect, sf = reference_sf(lt))
+    assert_results_close(stock_driven(lt, NegativeInflowCorrect, backend = backend), expected)
+    if NegativeInflowCorrect is True:
+        assert expected[2].min() >= 0
+        assert_results_close(stock_driven(lt, NegativeInflowCorrect, LazyScaling = True, backend = backend), expected)
+
+@pytest.mark.parametrize('lifetime', list(lifetimes))
+def test_lazy_scaling(lifetime):
+    # with one correction per age-cohort, the lazy scaling is bit-identical, with many corrections the same up to rounding
+    lt = lifetimes[lifetime]
+    assert_results_equal(stock_driven(lt, True, LazyScaling = True), stock_driven(lt, True))
+    expected = stock_driven(lt, True, s = declining_stock())
+    assert (expected[2][40:] == 0).sum() >= 10
+    for result, reference in zip(stock_driven(lt, True, LazyScaling = True, s = declining_stock()), expected):
+        np.testing.assert_allclose(result, reference, rtol = 0, atol = 1e-13 * declining_stock().max())
+
+@pytest.mark.parametrize('NegativeInflowCorrect', [False, True])
+@pytest.mark.parametrize('backend', backends)
+@pytest.mark.parametrize('lifetime', list(lifetimes))
+def test_stock_driven_model_initialstock(lifetime, backend, NegativeInflowCorrect):
+    lt = lifetimes[lifetime]
+    expected = stock_driven_initialstock(lt, NegativeInflowCorrect, sf = reference_sf(lt))
+    assert_results_close(stock_driven_initialstock(lt, NegativeInflowCorrect, backend = backend), expected)
+    Surviving = reference_sf(lt)[SwitchTime - 2, 0:SwitchTime - 1] != 0 # the initial stock of age-cohorts with a lifetime of 0 cannot be kept
+    np.testing.assert_allclose(expected[0][SwitchTime - 2, 0:SwitchTime - 1][Surviving], initial_stock()[Surviving], rtol = rtol)
+
+@pytest.mark.parametrize('LazyScaling', [False, True])
+@pytest.mark.parametrize('backend', backends)
+@pytest.mark.parametrize('lifetime', list(lifetimes))
+def test_batch(lifetime, backend, LazyScaling):
+    # a batch of 3 models (stock & lifetimes scaled) equals the models solved one by one, bit for bit with the numpy backend
+    lt = lifetimes[lifetime]
+    factors = np.array([0.5, 1.0, 2.0])
+    lt_batch = {ThisKey: (Par if ThisKey == 'Type' else np.multiply.outer(np.sqrt(factors), Par)) for ThisKey, Par in lt.items()}
+    model = DSMBatch(t = np.arange(0, NoofYears), s = np.multiply.outer(factors, stock()), lt = lt_batch, backend = backend)
+    results = model.compute_stock_driven_model(NegativeInflowCorrect = True, LazyScaling = LazyScaling)
+    for b in range(0, len(factors)):
+        lt_b = {ThisKey: (Par if ThisKey == 'Type' else Par[b]) for ThisKey, Par in lt_batch.items()}
+        single = DSM(t = np.arange(0, NoofYears), s = stock(factors[b]), lt = lt_b).compute_stock_driven_model(NegativeInflowCorrect = True, LazyScaling = LazyScaling)
+        if backend == 'numpy':
+            assert_results_equal([result[b] for result in results], single)
+        else:
+            assert_results_close([result[b] for result in results], single)
+
+def test_batch_shared_survival_table():
+    # one survival table shared by a 2 x 2 batch
+    sf = reference_sf(lifetimes['Normal'])
+    s = np.multiply.outer(np.array([[0.5, 1.0], [1.5, 2.0]]), stock())
+    results = DSMBatch(t = np.arange(0, NoofYears), s = s, sf = sf).compute_stock_driven_model(NegativeInflowCorrect = True)
+    for b in np.ndindex(2, 2):
+        single = DSM(t = np.arange(0, NoofYears), s = s[b], lt = lifetimes['Normal'], sf = sf).compute_stock_driven_model(NegativeInflowCorrect = True)
+        assert_results_equal([result[b] for result in results], single)
+
+def test_numba_fallback(monkeypatch):
+    # without numba, the numba backend warns & runs the numpy year loop
+    monkeypatch.setattr(dynamic_stock_model, 'numba', None)
+    with pytest.warns(UserWarning, match = 'numba is not installed'):
+        assert dynamic_stock_model.use_compiled_backend('numba') is False
+    assert dynamic_stock_model.use_compiled_backend('numpy') is False
+
+def scaled_lifetime(lt, ThisKey, factor):
+    """The lifetime with one parameter multiplied by a factor (a relative change keeps the cohorts with a lifetime of 0 at 0)."""
+    return dict(lt, **{ThisKey: lt[ThisKey] * factor})
+
+@pytest.mark.parametrize('lifetime', list(lifetimes))
+def test_sf_tangent(lifetime):
+    lt, h = lifetimes[lifetime], 1e-6
+    tangent = dynamic_stock_model.compute_sf_tangent(lt, NoofYears)
+    assert sorted(tangent) == sorted(ThisKey for ThisKey in lt if ThisKey != 'Type')
+    for ThisKey, Table in tangent.items():
+        # d sf[m, n] / d log Par[n] by central differences of the relative change of all age-cohorts (each column only depends on its own cohort)
+        difference = (dynamic_stock_model.compute_sf_array(scaled_lifetime(lt, ThisKey, 1 + h), NoofYears) - dynamic_stock_model.compute_sf_array(scaled_lifetime(lt, ThisKey, 1 - h), NoofYears)) / (2 * h)
+        np.testing.assert_allclose(Table * lt[ThisKey], difference, rtol = 1e-6, atol = 1e-8, err_msg = ThisKey)
+
+def test_sf_tangent_fixed():
+    tangent = dynamic_stock_model.compute_sf_tangent({'Type': 'Fixed', 'Mean': np.full(NoofYears, 20.0)}, NoofYears)
+    assert np.all(tangent['Mean'] == 0)
+
+@pytest.mark.parametrize('LazyScaling', [False, True])
+@pytest.mark.parametrize('NegativeInflowCorrect', [False, True])
+def test_stock_driven_model_tangent(NegativeInflowCorrect, LazyScaling):
+    # tangents of the stock (a relative change) & of the Weibull scale, against central differences of compute_stock_driven_model
+    lt, s, h = lifetimes['Weibull'], declining_stock(), 1e-6
+    sf_dot = dynamic_stock_model.compute_sf_tangent(lt, NoofYears)['Scale'] * lt['Scale']
+    model = DSMBatch(t = np.arange(0, NoofYears), s = s, lt = lt)
+    results = model.compute_stock_driven_model_tangent(s_dot = np.stack([s, np.zeros(NoofYears)]), sf_dot = np.stack([np.zeros(sf_dot.shape), sf_dot]),
+                                                       NegativeInflowCorrect = NegativeInflowCorrect, LazyScaling = LazyScaling)
+    assert_results_equal(results[:3], DSMBatch(t = np.arange(0, NoofYears), s = s, lt = lt).compute_stock_driven_model(NegativeInflowCorrect = NegativeInflowCorrect, LazyScaling = LazyScaling))
+    for number, (s_factor, lt_key) in enumerate([(h, None), (0, 'Scale')]):
+        def solve(sign):
+            lt_changed = lt if lt_key is None else scaled_lifetime(lt, lt_key, 1 + sign * h)
+            return DSM(t = np.arange(0, NoofYears), s = s * (1 + sign * s_factor), lt = lt_changed).compute_stock_driven_model(NegativeInflowCorrect = NegativeInflowCorrect, LazyScaling = LazyScaling)
+        for tangent, plus, minus in zip(results[3:], solve(1), solve(-1)):
+            np.testing.assert_allclose(tangent[number], (plus - minus) / (2 * h), rtol = 1e-5, atol = 1e-5 * np.abs(plus).max())
+
+# The end.
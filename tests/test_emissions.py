@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Emissions stage: the emissions computed from the material flows in memory equal the emissions of the material flows read back
+from material_output.csv (as before), and the material inflow is split into primary, secondary & reused materials.
+
+"""
+
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+from GloBUME.config import buildings, materials, regions, years
+from GloBUME.emissions import compute_emissions
+from GloBUME.model import run
+from GloBUME.output import write_material_output
+
+from conftest import make_config
+
+shape = (len(buildings), len(materials), regions, len(years))
+
+@pytest.fixture(scope = 'module')
+def material_flows():
+    rng = np.random.default_rng(0)
+    return {'inflow': rng.uniform(0, 100, shape), 'outflow': rng.uniform(0, 100, shape)}
+
+def test_material_split(config, inputs, material_flows):
+    emissions = compute_emissions(config, inputs, material_flows)
+    inflow = material_flows['inflow']
+    reuse = inflow - emissions['primary'] - emissions['secondary']
+    assert np.all(emissions['primary'] >= 0) and np.all(emissions['secondary'] >= 0) and np.all(reuse >= -1e-12)
+    np.testing.assert_allclose(emissions['primary'], inflow - np.minimum(inflow, material_flows['outflow'] * inputs['recovery_rate']), rtol = 1e-12)
+    np.testing.assert_allclose(reuse, np.minimum(inflow, material_flows['outflow'] * inputs['reuse_rate']), rtol = 1e-12, atol = 1e-12)
+    total = (emissions['primary'] * inputs['emission_primary_per_kg'] + emissions['secondary'] * inputs['emission_secondary_per_kg']).sum(axis = (0, 1))
+    np.testing.assert_allclose(emissions['emission_total'], total, rtol = 1e-12)
+
+def test_csv_round_trip(tmp_path, inputs, material_flows):
+    config = make_config(tmp_path, material_output = os.path.join(str(tmp_path), 'material_output.csv'))
+    write_material_output(config, material_flows)
+    building_materials = pd.read_csv(config.file(config.material_output))
+    written = {flow: np.array(building_materials.loc[(building_materials['flow']==flow)].iloc[:,5:], dtype = float).reshape(shape) for flow in ['inflow', 'outflow']}
+    np.testing.assert_allclose(compute_emissions(config, inputs, material_flows)['emission_total'], compute_emissions(config, inputs, written)['emission_total'], rtol = 1e-12)
+
+def test_no_material_output(tmp_path, inputs):
+    config = make_config(tmp_path, material_output = None)
+    run(config, inputs)
+    assert os.path.isfile(config.file(config.emission_output))
+    assert not os.path.isdir(os.path.join(str(tmp_path), 'output_material'))
+
+# The end.
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Ensemble statistics: the running statistics of an EnsembleReducer equal those of the kept draws (the quantiles exactly up to `compression`
+draws per cell, within about 1% in quantile beyond), do not depend on how the draws are split & merged, and ensemble() reduces the draws
+of monte_carlo().
+
+"""
+
+import numpy as np
+import pytest
+
+from GloBUME.ensemble import EnsembleReducer, ensemble
+from GloBUME.monte_carlo import monte_carlo
+
+probabilities = [0.05, 0.5, 0.95]
+
+# relative ranges (the _low, _median & _high material files are not in the repository)
+distributions = {'lifetime_shape': ('normal', 0.1), 'lifetime_scale': ('normal', 0.1), 'material_intensity': ('triangular', 0.2, 0.2), 'recovery_rate': ('uniform', 0.1), 'reuse_rate': ('uniform', 0.1)}
+
+def draws(count, seed = 0):
+    """count draws of 3 x 4 cells with normal, lognormal & uniform distributions."""
+    random = np.random.default_rng(seed)
+    return np.stack([random.normal(10, 2, (count, 4)), random.lognormal(0, 1, (count, 4)), random.uniform(-1, 1, (count, 4))], axis = 1)
+
+def reduced(values, parts = 1, compression = 32):
+    """Reducer of the values, added in batches of 7 draws to separate reducers (parts) that are merged."""
+    reducers = []
+    for part in np.array_split(values, parts):
+        reducer = EnsembleReducer(values.shape[1:], compression)
+        for start in range(0, len(part), 7):
+            reducer.add(part[start:start + 7])
+        reducers.append(reducer)
+    for reducer in reducers[1:]:
+        reducers[0].merge(reducer)
+    return reducers[0]
+
+def assert_moments(reducer, values):
+    assert reducer.count == len(values)
+    np.testing.assert_allclose(reducer.mean, values.mean(axis = 0), rtol = 1e-12)
+    np.testing.assert_allclose(reducer.sd, values.std(axis = 0, ddof = 1), rtol = 1e-10)
+    np.testing.assert_array_equal(reducer.statistic('min'), values.min(axis = 0))
+    np.testing.assert_array_equal(reducer.statistic('max'), values.max(axis = 0))
+
+@pytest.mark.parametrize('parts', [1, 3])
+def test_small_ensemble(parts):
+    # up to compression draws per cell, the quantiles are exact (linear between the sorted draws at the middle of their rank)
+    values = draws(30)
+    reducer = reduced(values, parts)
+    assert_moments(reducer, values)
+    for probability in probabilities:
+        np.testing.assert_allclose(reducer.quantile(probability), np.quantile(values, probability, axis = 0, method = 'hazen'), rtol = 1e-12)
+    np.testing.assert_allclose(reducer.statistic('p95'), reducer.quantile(0.95))
+
+@pytest.mark.parametrize('parts', [1, 4])
+def test_large_ensemble(parts):
+    values = draws(3000)
+    reducer = reduced(values, parts)
+    assert_moments(reducer, values)
+    assert reducer.centroids.shape[-1] <= reducer.compression
+    for probability in probabilities:
+        # quantile (share of the draws below) of the estimated quantile
+        rank = (values < reducer.quantile(probability)).mean(axis = 0)
+        assert np.all(np.abs(rank - probability) <= 0.01)
+
+def test_merge_order():
+    values = draws(1000)
+    merged, single = reduced(values, 5), reduced(values, 1)
+    np.testing.assert_allclose(merged.mean, single.mean, rtol = 1e-12)
+    np.testing.assert_allclose(merged.variance, single.variance, rtol = 1e-10)
+
+def test_merge_shapes():
+    with pytest.raises(ValueError):
+        EnsembleReducer((3, 4)).merge(EnsembleReducer((4, 3)))
+    reducer = EnsembleReducer((3, 4))
+    assert np.all(np.isnan(reducer.quantile(0.5))) and np.all(np.isnan(reducer.sd))
+
+def test_ensemble(config):
+    reducers = ensemble(config, 5, distributions, seed = 3, batch = 2, processes = 1, outputs = ('emission_total',), first_year = 2015)
+    values = monte_carlo(config, 5, distributions, seed = 3, batch = 3, processes = 1)['emission_total'][..., -46:]
+    assert_moments(reducers['emission_total'], values)
+    np.testing.assert_allclose(reducers['emission_total'].quantile(0.5), np.median(values, axis = 0), rtol = 1e-12)
+
+# The end.
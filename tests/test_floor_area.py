@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Floor area: parity of the array evaluation of the commercial floor area per capita & of the residential floor area in the floor area stage
+with the original loops & per-type frames of the model script.
+
+"""
+
+import math
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+from GloBUME.floor_area import commercial_floorspace, residential_floor_area
+
+folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+inflation = 1.2423
+
+def read_csv(*path, **options):
+    return pd.read_csv(os.path.join(folder, *path), **options)
+
+@pytest.fixture(scope = 'module')
+def sva_pc():
+    return read_csv('files_GDP', 'sva_pc.csv', index_col = [0]).loc[1971:2060, [str(region) for region in range(1,27)]] * inflation
+
+def reference_commercial_floorspace(sva_pc, gompertz, alpha, beta, gamma, flag_ExpDec):
+    """The commercial m2/cap, its subdivision & the minimum values of the historic tail, as in the original loops of the model script."""
+    total = np.zeros((90, 26))
+    types = np.zeros((4, 90, 26))
+    minimum = [25, 25, 25, 25]
+    for year in range(1971,2061):
+        for region in range(1,27):
+            if flag_ExpDec == 0:
+                total[year - 1971, region - 1] = alpha * math.exp(-beta * math.exp((-gamma/1000) * sva_pc[str(region)][year]))
+            else:
+                total[year - 1971, region - 1] = max(0.542, alpha - beta * math.exp((-gamma/1000) * sva_pc[str(region)][year]))
+            commercial = [gompertz[name]['a'] * math.exp(-gompertz[name]['b'] * math.exp((-gompertz[name]['c']/1000) * sva_pc[str(region)][year])) for name in ['Office','Retail+','Hotels+','Govt+']]
+            minimum = [value if value < minimum[index] else minimum[index] for index, value in enumerate(commercial)]
+            for index, value in enumerate(commercial):
+                types[index, year - 1971, region - 1] = total[year - 1971, region - 1] * (value / sum(commercial))
+    return total, types, np.array(minimum)
+
+@pytest.mark.parametrize('parameters', ['Gompertz_parameters.csv', 'Gompertz_parameters_alpha.csv'])
+@pytest.mark.parametrize('flag_ExpDec', [0, 1])
+def test_commercial_floorspace(sva_pc, parameters, flag_ExpDec):
+    gompertz = read_csv('files_floor_area', 'files_commercial', parameters, index_col = [0])
+    alpha = gompertz['All']['a'] if flag_ExpDec == 0 else 25.601
+    beta =  gompertz['All']['b'] if flag_ExpDec == 0 else 28.431
+    gamma = gompertz['All']['c'] if flag_ExpDec == 0 else 0.0415
+    result = commercial_floorspace(sva_pc, gompertz, alpha, beta, gamma, flag_ExpDec)
+    for value, reference in zip(result, reference_commercial_floorspace(sva_pc, gompertz, alpha, beta, gamma, flag_ExpDec)):
+        np.testing.assert_allclose(value, reference, rtol = 1e-12)
+
+def reference_residential_floor_area(people, housing_share, avg_m2_cap, floorspace):
+    """The m2 by area, housing type, year & region, as in the original per-type frames & loops of the model script."""
+    m2 = np.zeros((2, 4) + people.shape[1:])
+    for area in range(0, 2):
+        people_type = [housing_share[area, number] * people[area] for number in range(0, 4)]
+        m2_unadjusted = [avg_m2_cap[area, number] * people_type[number] for number in range(0, 4)]
+        total_m2_adj = np.zeros(people.shape[1:])
+        for year in range(0, people.shape[1]):
+            for region in range(0, people.shape[2]):
+                total_m2_adj[year, region] = m2_unadjusted[0][year, region] + m2_unadjusted[1][year, region] + m2_unadjusted[2][year, region] + m2_unadjusted[3][year, region]
+        m2_cap_adj_fact = floorspace[area] / (total_m2_adj / people[area])
+        for number in range(0, 4):
+            m2[area, number] = m2_unadjusted[number] * m2_cap_adj_fact
+    return m2
+
+def test_residential_floor_area():
+    rng = np.random.default_rng(0)
+    people = rng.uniform(0.1, 100, (2, 340, 26))
+    housing_share = rng.uniform(0, 1, (2, 4, 26))
+    housing_share = housing_share / housing_share.sum(axis = 1, keepdims = True)
+    avg_m2_cap = rng.uniform(10, 60, (2, 4, 26))
+    floorspace = rng.uniform(5, 50, (2, 340, 26))
+    people_type, m2_unadjusted, m2_cap_adj_fact, m2_res = residential_floor_area(people, housing_share, avg_m2_cap, floorspace)
+    np.testing.assert_array_equal(m2_res, reference_residential_floor_area(people, housing_share, avg_m2_cap, floorspace))
+    # the m2 by housing type add up to the IMAGE floorspace per capita times the population
+    np.testing.assert_allclose(m2_res.sum(axis = 1), floorspace * people, rtol = 1e-12)
+    np.testing.assert_allclose(people_type.sum(axis = 1), people, rtol = 1e-12)
+
+# The end.
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Global sensitivity analysis: the Sobol estimators give the analytical indices of the Ishigami function, the Morris effects of a linear
+function are its coefficients, and the runs of the design points equal single runs of the model with the multiplied inputs.
+
+"""
+
+import collections
+import numpy as np
+import pytest
+
+from GloBUME.config import years
+from GloBUME.gsa import saltelli_design, sobol_indices, morris_design, morris_indices, factor_sample, run_points, gsa
+from GloBUME.model import run
+
+factors = collections.OrderedDict([('x1', (-np.pi, np.pi)), ('x2', (-np.pi, np.pi)), ('x3', (-np.pi, np.pi))])
+
+def ishigami(points):
+    x = -np.pi + 2 * np.pi * points
+    return np.sin(x[:, 0]) + 7 * np.sin(x[:, 1]) ** 2 + 0.1 * x[:, 2] ** 4 * np.sin(x[:, 0])
+
+def test_sobol_indices():
+    # the analytical indices of the Ishigami function (a = 7, b = 0.1)
+    variance = 0.5 * (1 + 0.1 * np.pi ** 4 / 5) ** 2 + 49 / 8 + 0.01 * np.pi ** 8 * 8 / 225
+    first = np.array([0.5 * (1 + 0.1 * np.pi ** 4 / 5) ** 2, 49 / 8, 0]) / variance
+    total = np.array([0.5 * (1 + 0.1 * np.pi ** 4 / 5) ** 2 + 0.01 * np.pi ** 8 * 8 / 225, 49 / 8, 0.01 * np.pi ** 8 * 8 / 225]) / variance
+    points = saltelli_design(factors, 4096)
+    assert points.shape == (4096 * 5, 3) and np.all((points >= 0) & (points <= 1))
+    indices = sobol_indices(ishigami(points), 3)
+    np.testing.assert_allclose(indices['S1'], first, atol = 0.02)
+    np.testing.assert_allclose(indices['ST'], total, atol = 0.02)
+
+def test_morris_indices():
+    points, order, steps = morris_design(factors, 10, levels = 4, seed = 1)
+    trajectories = points.reshape(10, 4, 3)
+    # one factor changes by delta (2/3) at each step of a trajectory
+    changes = np.diff(trajectories, axis = 1)
+    assert np.all(np.count_nonzero(changes, axis = 2) == 1)
+    np.testing.assert_allclose(np.abs(changes).sum(axis = 2), 2 / 3)
+    indices = morris_indices(points @ np.array([2.0, -3.0, 0.5]), order, steps)
+    np.testing.assert_allclose(indices['mu'], [2.0, -3.0, 0.5])
+    np.testing.assert_allclose(indices['mu_star'], [2.0, 3.0, 0.5])
+    np.testing.assert_allclose(indices['sigma'], 0, atol = 1e-12)
+
+@pytest.mark.parametrize('levels', [2, 6])
+def test_morris_grid(levels):
+    # with an even number of levels, all points are on the grid between 0 & 1
+    points = morris_design(factors, 20, levels = levels, seed = 2)[0]
+    np.testing.assert_allclose(np.round(points * (levels - 1)), points * (levels - 1), atol = 1e-12)
+    assert points.min() >= 0 and points.max() <= 1 + 1e-12
+
+@pytest.mark.parametrize('levels', [1, 3])
+def test_morris_odd_levels(levels):
+    with pytest.raises(ValueError, match = 'even'):
+        morris_design(factors, 2, levels = levels)
+
+def test_factor_sample(inputs):
+    model_factors = collections.OrderedDict([('gompertz_a', (0.9, 1.1)), ('recovery_rate', (1, 3))])
+    samples = factor_sample(inputs, model_factors, [1.0, 1.0])
+    np.testing.assert_allclose(samples['gompertz'].loc['a'], inputs['gompertz'].loc['a'] * 1.1)
+    np.testing.assert_array_equal(samples['gompertz'].loc['b'], inputs['gompertz'].loc['b'])
+    assert np.nanmax(np.asarray(samples['recovery_rate'])) <= 1
+    with pytest.raises(ValueError):
+        factor_sample(inputs, {'lifetime': (0.9, 1.1)}, [0.5])
+
+def test_run_points(config, inputs):
+    # the emissions of a batch of points equal single runs with the multiplied inputs (the Gompertz curves recompute the floor area)
+    model_factors = collections.OrderedDict([('gompertz_a', (0.9, 1.1)), ('emission_primary', (0.5, 1.5))])
+    points = np.array([[0.5, 0.5], [1.0, 0.0]])
+    results = run_points(config, model_factors, points)
+    for point, result in zip(points, results):
+        expected = run(config, dict(inputs, **factor_sample(inputs, model_factors, point)))['emissions']['emission_total'][:, years.index(2015):]
+        np.testing.assert_allclose(result, expected, rtol = 1e-12)
+
+def test_gsa(config):
+    indices = gsa(config, 'morris', 2, collections.OrderedDict([('emission_primary', (0.9, 1.1)), ('emission_secondary', (0.9, 1.1))]), processes = 1)
+    assert sorted(indices) == ['mu', 'mu_star', 'sigma']
+    assert indices['mu'].shape == (2, 26, 2060 - 2015 + 1)
+    assert np.all(indices['mu'] >= 0)
+
+# The end.
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Historic tail: parity of the closed-form tails of GloBUME/historic_tail.py (1721-2060) with the original loops over regions & years of the model script,
+on the input data of the repository.
+
+"""
+
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+from GloBUME import historic_tail
+from GloBUME.floor_area import commercial_floorspace
+
+folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def read_csv(*path, **options):
+    return pd.read_csv(os.path.join(folder, *path), **options)
+
+@pytest.fixture(scope = 'module')
+def data():
+    """The IMAGE series as prepared in the model script: floorspace (m2/cap), population shares & population (1971-2060), commercial m2/cap."""
+    floorspace = read_csv('files_floor_area', 'res_Floorspace.csv')
+    floorspace = floorspace[floorspace.Region != 27]
+    rurpop = read_csv('files_population', 'rurpop.csv', index_col = [0])
+    pop = read_csv('files_population', 'pop.csv', index_col = [0])
+    gompertz = read_csv('files_floor_area', 'files_commercial', 'Gompertz_parameters.csv', index_col = [0])
+    sva_pc = read_csv('files_GDP', 'sva_pc.csv', index_col = [0]).loc[1971:2060, rurpop.columns] * 1.2423
+    total, commercial, minimum_com = commercial_floorspace(sva_pc, gompertz, gompertz['All']['a'], gompertz['All']['b'], gompertz['All']['c'], 0)
+    return {'floorspace_urb': floorspace.pivot(index = "t", columns = "Region", values = "Urban").values,
+            'floorspace_rur': floorspace.pivot(index = "t", columns = "Region", values = "Rural").values,
+            'rurpop': rurpop, 'pop': pop,
+            'rurpop2': rurpop.reindex(list(range(1970,2061,1))).interpolate().iloc[1:].values,
+            'pop2': pop.reindex(list(range(1970,2061,1))).interpolate().iloc[1:].values,
+            'hist_pop': read_csv('files_initial_stock', 'hist_pop.csv', index_col = [0]).loc[1820:1970, rurpop.columns].values,
+            'commercial': commercial, 'minimum_com': minimum_com}
+
+def reference_tail(image, trend_global, minimum):
+    """Tail (1721-2060) of a floorspace series as in the original loops: trend-based decline 1820-1970 & linear ramp 1721-1819."""
+    tail = np.zeros((340, 26))
+    for region in range(0, 26):
+        for year in range(1820,1971):
+            tail[year - 1721, region] = max(minimum, image[0, region] * ((100 - trend_global)/100)**(1971 - year))
+    return ramp(tail, image)
+
+def ramp(tail, image):
+    for region in range(0, 26):
+        for time in range(1721,1820):
+            tail[time - 1721, region] = max(0.0, tail[1820 - 1721, region] - (tail[1820 - 1721, region]/100)*(1820 - time))
+    tail[1971 - 1721:] = image
+    return tail
+
+def reference_trend(image):
+    """Average global annual decline in % (the growth by year over the first 10 years of IMAGE data, averaged by region, then globally)."""
+    trend_by_region = [sum([image[year - 1971, region]/image[year - 1970, region] for year in range(1971,1981)])/10 for region in range(0, 26)]
+    return (1 - (sum(trend_by_region)/26))*100
+
+def reference_tails(data):
+    tails = {}
+    for area in ['urb', 'rur']:
+        image = data['floorspace_' + area]
+        tails['floorspace_' + area] = reference_tail(image, reference_trend(image), image.min())
+    for number, name in enumerate(['office', 'retail', 'hotels', 'govern']):
+        image = data['commercial'][number]
+        tails['commercial_' + name] = reference_tail(image, reference_trend(image), data['minimum_com'][number])
+    rurpop, pop = data['rurpop'], data['pop']
+    maximum_rurpop = rurpop.values.max()
+    rurpop_tail, pop_tail = np.zeros((340, 26)), np.zeros((340, 26))
+    for region in range(1,27):
+        rurpop_trend = ((1 - (rurpop[str(region)][1980]/rurpop[str(region)][1970]))/10)*100
+        for year in range(1820,1971):
+            rurpop_tail[year - 1721, region - 1] = min(maximum_rurpop, rurpop[str(region)][1970] * ((100 + rurpop_trend)/100)**(1970 - year))
+            pop_tail[year - 1721, region - 1] = data['hist_pop'][year - 1820, region - 1] * pop[str(region)][1970]
+    urbpop_tail = 1 - rurpop_tail
+    tails['rurpop'] = ramp(rurpop_tail, data['rurpop2'])
+    tails['urbpop'] = ramp(urbpop_tail, 1 - data['rurpop2'])
+    tails['pop'] = ramp(pop_tail, data['pop2'])
+    return tails
+
+def test_historic_tails(data):
+    rurpop, pop = data['rurpop'], data['pop']
+    tails = historic_tail.historic_tails(data['floorspace_urb'], data['floorspace_rur'], rurpop.loc[1970], rurpop.loc[1980], rurpop.values.max(), data['rurpop2'], pop.loc[1970], data['pop2'], data['hist_pop'], data['commercial'], data['minimum_com'])
+    expected = reference_tails(data)
+    assert sorted(tails) == sorted(expected)
+    for name in expected:
+        assert tails[name].shape == (340, 26)
+        np.testing.assert_allclose(tails[name], expected[name], rtol = 1e-12, atol = 1e-12, err_msg = name)
+
+# The end.
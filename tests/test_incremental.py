@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental recomputation: run_incremental after a change of the inputs gives the results of a full run with the changed inputs,
+recomputing only the changed building types & regions.
+
+"""
+
+import numpy as np
+import pytest
+
+from GloBUME.config import buildings, regions
+from GloBUME.incremental import run_incremental
+from GloBUME.model import run
+
+from conftest import make_config
+
+@pytest.fixture(scope = 'module')
+def previous(config, inputs):
+    return run(config, inputs)
+
+def assert_same_results(results, expected):
+    for stage, names in [('stock', ['inflow', 'outflow_cohort']), ('materials', ['inflow', 'outflow']), ('emissions', ['emission_total'])]:
+        for name in names:
+            np.testing.assert_allclose(results[stage][name], expected[stage][name], rtol = 1e-12, atol = 1e-12)
+
+def test_changed_inputs(config, inputs, previous):
+    changed = dict(inputs)
+    changed['lifetime_scale'] = inputs['lifetime_scale'].set(2030, inputs['lifetime_scale'].at(2030)[8, 3] * 1.2, (8, 3)) # office lifetime in region 4, from 2030
+    changed['material_intensity'] = inputs['material_intensity'].set(2020, 0.9 * inputs['material_intensity'].at(2020)[2, 1, 5], (2, 1, 5))
+    results = run_incremental(config, previous, changed)
+    assert results['recomputed'] == {'stock': 1, 'materials': 2}
+    assert_same_results(results, run(config, changed))
+    assert not np.array_equal(results['emissions']['emission_total'], previous['emissions']['emission_total'])
+
+def test_unchanged_inputs(config, inputs, previous):
+    results = run_incremental(config, previous, inputs)
+    assert results['recomputed'] == {'stock': 0, 'materials': 0}
+    assert_same_results(results, previous)
+
+def test_changed_setting(tmp_path, inputs, previous):
+    config = make_config(tmp_path, flag_Normal = 1)
+    results = run_incremental(config, previous, inputs)
+    assert results['recomputed']['stock'] == len(buildings) * regions
+    assert_same_results(results, run(config, inputs))
+
+def test_cached_previous(config, inputs, previous):
+    with pytest.raises(ValueError):
+        run_incremental(config, dict(previous, stock = None), inputs)
+
+# The end.
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Binary input cache: the cached csv-files read back as the parsed csv-files, changed files are converted again & the inputs loaded through
+the cache equal the inputs parsed from the csv-files.
+
+"""
+
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+from GloBUME.config import Config
+from GloBUME.input_cache import InputCache
+from GloBUME.inputs import load_inputs
+
+name = os.path.join('files_test', 'table.csv')
+
+def write_table(path, values):
+    os.makedirs(os.path.join(str(path), 'files_test'), exist_ok = True)
+    frame = pd.DataFrame({'Region': [1, 2, 3], 'Building_type': ['detached', 'office', None], 'steel': values, 'glass': [0.5, np.nan, 2.0]})
+    frame.to_csv(os.path.join(str(path), name), index = False)
+    return pd.read_csv(os.path.join(str(path), name))
+
+def test_read(tmp_path):
+    expected = write_table(tmp_path, [1.0, 2.5, 3.0])
+    cache = InputCache(str(tmp_path), str(tmp_path / 'cache'))
+    pd.testing.assert_frame_equal(cache.read(name), expected)     # converted
+    pd.testing.assert_frame_equal(cache.read(name), expected)     # from the cache
+    assert (cache.builds, cache.hits) == (1, 1)
+    # a new cache (e.g. in another run) uses the stored files
+    cache = InputCache(str(tmp_path), str(tmp_path / 'cache'))
+    pd.testing.assert_frame_equal(cache.read(name), expected)
+    assert (cache.builds, cache.hits) == (0, 1)
+
+def test_changed_file(tmp_path):
+    write_table(tmp_path, [1.0, 2.5, 3.0])
+    cache = InputCache(str(tmp_path), str(tmp_path / 'cache'))
+    cache.read(name)
+    expected = write_table(tmp_path, [1.0, 2.5, 4.0])
+    stat = os.stat(os.path.join(str(tmp_path), name))
+    os.utime(os.path.join(str(tmp_path), name), ns = (stat.st_atime_ns, stat.st_mtime_ns + 10**9)) # also if the modification time did not change enough
+    pd.testing.assert_frame_equal(cache.read(name), expected)
+    assert cache.builds == 2
+
+def test_touched_file(tmp_path):
+    expected = write_table(tmp_path, [1.0, 2.5, 3.0])
+    cache = InputCache(str(tmp_path), str(tmp_path / 'cache'))
+    cache.read(name)
+    stat = os.stat(os.path.join(str(tmp_path), name))
+    os.utime(os.path.join(str(tmp_path), name), ns = (stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    # same content: the cache is kept (checked by hash)
+    pd.testing.assert_frame_equal(cache.read(name), expected)
+    pd.testing.assert_frame_equal(cache.read(name), expected)
+    assert (cache.builds, cache.hits) == (1, 2)
+
+def test_load_inputs(config, inputs):
+    parsed = load_inputs(Config(path = config.path, input_cache = None))
+    cached = load_inputs(config)    # from the cache filled by the inputs fixture
+    assert sorted(cached) == sorted(parsed) == sorted(inputs)
+    for key in parsed:
+        if isinstance(parsed[key], pd.DataFrame):
+            pd.testing.assert_frame_equal(cached[key], parsed[key])
+        else:
+            np.testing.assert_array_equal(np.asarray(cached[key]), np.asarray(parsed[key]))
+
+# The end.
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Materials stage: the material inflow & outflow computed as whole-array products equal the original loops over building types,
+materials & regions (material outflow = the outflow by cohort times the material intensity of the cohort, summed over the cohorts, as one einsum).
+
+"""
+
+import numpy as np
+import pytest
+
+from GloBUME.materials import material_outflow, compute_materials
+
+def reference_material_outflow(m2_outflow_cohort, material_density):
+    """Material outflow (region x year), as in the original loop over the regions."""
+    emp = []
+    for i in range(0, m2_outflow_cohort.shape[0]):
+        md = material_density[i]                              # material density by cohort
+        material_outflow_cohort = m2_outflow_cohort[i] * md   # year x cohort
+        material_outflow_cohort_sum = material_outflow_cohort.sum(1)
+        emp.append(material_outflow_cohort_sum)
+    return np.array(emp)
+
+def reference_materials(inputs, stock):
+    intensity = inputs['material_intensity']
+    inflow = np.zeros(intensity.shape)
+    outflow = np.zeros(intensity.shape)
+    for building in range(0, intensity.shape[0]):
+        for material in range(0, intensity.shape[1]):
+            inflow[building, material] = stock['inflow'][building] * intensity[building, material]
+            outflow[building, material] = reference_material_outflow(stock['outflow_cohort'][building], intensity[building, material])
+    return {'inflow': inflow, 'outflow': outflow}
+
+@pytest.fixture(scope = 'module')
+def stock():
+    # 3 building types, 4 regions & 30 years, the outflow of each cohort in the years after the cohort
+    rng = np.random.default_rng(0)
+    outflow_cohort = np.tril(rng.uniform(0, 10, (3, 4, 30, 30)))
+    return {'inflow': rng.uniform(0, 100, (3, 4, 30)), 'outflow_cohort': outflow_cohort}
+
+@pytest.mark.parametrize('materials', [7, 2])
+def test_compute_materials(stock, materials):
+    # the number of materials follows from the material intensity (building type x material x region x cohort)
+    inputs = {'material_intensity': np.random.default_rng(materials).uniform(0, 200, (3, materials, 4, 30))}
+    flows = compute_materials(None, inputs, stock)
+    expected = reference_materials(inputs, stock)
+    assert flows['inflow'].shape == flows['outflow'].shape == (3, materials, 4, 30)
+    np.testing.assert_array_equal(flows['inflow'], expected['inflow'])
+    np.testing.assert_allclose(flows['outflow'], expected['outflow'], rtol = 1e-12)
+
+def test_material_outflow(stock):
+    # all regions & materials of one building type (material x region x cohort), & all building types at once
+    intensity = np.random.default_rng(1).uniform(0, 200, (3, 5, 4, 30))
+    outflow = material_outflow(stock['outflow_cohort'], intensity)
+    assert outflow.shape == (3, 5, 4, 30)
+    for building in range(0, 3):
+        np.testing.assert_allclose(material_outflow(stock['outflow_cohort'][building], intensity[building]), outflow[building], rtol = 1e-12)
+        for material in range(0, 5):
+            np.testing.assert_allclose(outflow[building, material], reference_material_outflow(stock['outflow_cohort'][building], intensity[building, material]), rtol = 1e-12)
+
+# The end.
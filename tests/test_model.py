@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+The stages of the GloBUME package (run) reproduce the reference output of the original model script, output_material/material_output.csv
+& output_emission/GHG_total.csv (written with 10 significant digits), and the written output reads back the same.
+
+"""
+
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+from GloBUME.config import years
+from GloBUME.model import run
+from GloBUME.output import material_output_frame
+
+from conftest import make_config
+
+reference_folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def reference(name):
+    return pd.read_csv(os.path.join(reference_folder, name), index_col = 0)
+
+def year_columns(frame):
+    return [column for column in frame.columns if str(column).isdigit()]
+
+@pytest.fixture(scope = 'module')
+def run_config(tmp_path_factory):
+    folder = tmp_path_factory.mktemp('run')
+    return make_config(folder, material_output = os.path.join(str(folder), 'output_material', 'material_output.csv'))
+
+@pytest.fixture(scope = 'module')
+def results(run_config, inputs):
+    return run(run_config, inputs)
+
+def test_emissions(results):
+    expected = reference('output_emission/GHG_total.csv')
+    start = years.index(int(expected.columns[0]))
+    np.testing.assert_allclose(results['emissions']['emission_total'][:, start:], expected.to_numpy(), rtol = 1e-8, atol = 1e-6)
+
+def test_material_flows(results):
+    expected = reference('output_material/material_output.csv')
+    frame = material_output_frame(results['materials'])
+    assert frame[['flow', 'type', 'area', 'material']].values.tolist() == expected[['flow', 'type', 'area', 'material']].values.tolist()
+    np.testing.assert_allclose(frame[[int(year) for year in year_columns(expected)]].to_numpy(dtype = float), expected[year_columns(expected)].to_numpy(), rtol = 1e-8, atol = 1e-6)
+
+def test_written_output(run_config, results):
+    written = pd.read_csv(run_config.file(run_config.emission_output), index_col = 0)
+    np.testing.assert_allclose(written.to_numpy(), results['emissions']['emission_total'], rtol = 1e-12)
+    written = pd.read_csv(run_config.file(run_config.material_output), index_col = 0)
+    assert written.shape == material_output_frame(results['materials']).shape
+
+# The end.
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Monte Carlo analysis: draws without spread reproduce run(), the draws do not depend on the batches, and the sampled values follow
+their distributions & bounds.
+
+"""
+
+import numpy as np
+import pytest
+
+from GloBUME.model import run
+from GloBUME.monte_carlo import monte_carlo, sample, triangular
+from GloBUME.stock import inflow_outflown
+from dynamic_stock_model import sf_cache
+
+no_spread = {'lifetime_shape': ('normal', 0), 'lifetime_scale': ('lognormal', 0), 'material_intensity': ('uniform', 0), 'recovery_rate': ('triangular', 0, 0), 'reuse_rate': ('uniform', 0)}
+spread = {'lifetime_shape': ('normal', 0.1), 'lifetime_scale': ('lognormal', 0.1), 'material_intensity': ('triangular', 0.2, 0.3), 'recovery_rate': ('uniform', 0.5), 'reuse_rate': ('uniform', 0.5)}
+
+def test_no_spread(config, inputs):
+    expected = run(config, inputs)
+    results = monte_carlo(config, 2, no_spread, batch = 2, processes = 1, outputs = ('emission_total', 'material_inflow'))
+    assert results['emission_total'].shape == (2,) + expected['emissions']['emission_total'].shape
+    for draw in range(0, 2):
+        np.testing.assert_allclose(results['emission_total'][draw], expected['emissions']['emission_total'], rtol = 1e-12)
+        np.testing.assert_allclose(results['material_inflow'][draw], expected['materials']['inflow'], rtol = 1e-12)
+
+def test_batches(config):
+    results = monte_carlo(config, 3, spread, seed = 5, batch = 3, processes = 1)
+    np.testing.assert_array_equal(monte_carlo(config, 3, spread, seed = 5, batch = 2, processes = 1)['emission_total'], results['emission_total'])
+    assert not np.array_equal(results['emission_total'][0], results['emission_total'][1])
+
+def test_sample(config, inputs):
+    samples = sample(config, inputs, spread, 0, 1)
+    for name in ['recovery_rate', 'reuse_rate']:
+        values = np.asarray(samples[name])
+        assert np.nanmin(values) >= 0 and np.nanmax(values) <= 1
+    ratio = samples['material_intensity'].base / inputs['material_intensity'].base
+    ratio = ratio[np.isfinite(ratio)]
+    assert ratio.min() >= 0.8 and ratio.max() <= 1.3
+    # the same draw gives the same sample
+    np.testing.assert_array_equal(sample(config, inputs, spread, 0, 1)['lifetime_scale'].base, samples['lifetime_scale'].base)
+    with pytest.raises(ValueError):
+        sample(config, inputs, {'recovery_rate': ('triangular',)}, 0, 1)
+
+def test_default_distributions(config, inputs):
+    # the default distributions only use the files of the repository, ('triangular',) names the missing material files
+    assert monte_carlo(config, 1, processes = 1)['emission_total'].shape == (1,) + inputs['recovery_rate'].shape[2:]
+    with pytest.raises(ValueError, match = 'Building_materials_low.csv'):
+        sample(config, inputs, {'material_intensity': ('triangular',)}, 0, 1)
+
+def test_sf_cache(config, inputs):
+    # the sampled lifetimes do not go through (& evict the survival tables of the model runs from) the shared cache
+    monte_carlo(config, 1, no_spread, processes = 1)
+    state = (sf_cache.hits, sf_cache.misses, list(sf_cache.tables))
+    monte_carlo(config, 2, spread, seed = 3, batch = 2, processes = 1)
+    assert (sf_cache.hits, sf_cache.misses, list(sf_cache.tables)) == state
+    # the same tables with & without the cache
+    shape, scale = inputs['lifetime_shape'][0], inputs['lifetime_scale'][0]
+    stock = np.linspace(1, 100, scale.shape[0] * scale.shape[1]).reshape(scale.shape)
+    for expected, result in zip(inflow_outflown(shape, scale, stock, config.flag_Normal), inflow_outflown(shape, scale, stock, config.flag_Normal, cache = False)):
+        np.testing.assert_array_equal(result, expected)
+
+def test_triangular():
+    values = triangular(np.random.default_rng(0).random(100000), 1.0, 2.0, 4.0)
+    assert values.min() >= 1 and values.max() <= 4
+    assert abs(values.mean() - 7 / 3) < 0.01
+    np.testing.assert_array_equal(triangular(np.linspace(0, 1, 5), 2.0, 2.0, 2.0), np.full(5, 2.0))
+
+# The end.
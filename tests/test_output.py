@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Output writers: the material & emission output written in each format (csv, csv.gz, parquet, hdf5, netcdf) reads back with the same labels
+& values. The binary formats are only tested if their (optional) library is installed.
+The outputs are written block by block: the csv output is the same as the one table of the original model & the blocks fill the parquet row groups
+& the hdf5 & netcdf chunks.
+
+"""
+
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+from GloBUME.config import buildings, building_names, materials, regions, years
+from GloBUME import output
+from GloBUME.output import Output, material_output, material_output_frame, emission_output_frame, write_material_output, write_emission_output, output_file
+
+from conftest import make_config
+
+shape = (len(buildings), len(materials), regions, len(years))
+
+@pytest.fixture(scope = 'module')
+def material_flows():
+    rng = np.random.default_rng(0)
+    return {'inflow': rng.uniform(0, 100, shape), 'outflow': rng.uniform(0, 100, shape)}
+
+@pytest.fixture(scope = 'module')
+def emissions():
+    return {'emission_total': np.random.default_rng(1).uniform(0, 1000, (regions, len(years)))}
+
+def reference_material_frame(material_flows):
+    """The material output as one table, as in the original model."""
+    tag = ['inflow', 'outflow']
+    values = np.array([material_flows['inflow'], material_flows['outflow']])
+    frame = pd.DataFrame(values.reshape(-1, len(years)), index = list(range(1, regions + 1)) * (len(tag) * len(buildings) * len(materials)), columns = years)
+    frame.insert(0, 'material', np.tile(np.repeat(materials, regions), len(tag) * len(buildings)))
+    frame.insert(0, 'area', np.tile(np.repeat([area for building, area in buildings], len(materials) * regions), len(tag)))
+    frame.insert(0, 'type', np.tile(np.repeat([building for building, area in buildings], len(materials) * regions), len(tag)))
+    frame.insert(0, 'flow', np.repeat(tag, len(buildings) * len(materials) * regions))
+    return frame
+
+def write(folder, material_flows, emissions, output_format, output_dtype = None):
+    """Write both outputs, returns the files of the material & the emission output."""
+    config = make_config(folder, material_output = os.path.join(str(folder), 'output_material', 'material_output.csv'), output_format = output_format, output_dtype = output_dtype)
+    write_material_output(config, material_flows)
+    write_emission_output(config, emissions)
+    extension = {'csv': '.csv', 'csv.gz': '.csv.gz', 'parquet': '.parquet', 'hdf5': '.h5', 'netcdf': '.nc'}[output_format]
+    return [output_file(config.file(name), extension) for name in [config.material_output, config.emission_output]]
+
+def assert_frame(frame, expected, rtol = 1e-12):
+    """A table read back (text column names) equals the expected table (year column names), up to the precision of the csv text."""
+    assert [str(column) for column in frame.columns] == [str(column) for column in expected.columns]
+    assert list(frame.index) == list(expected.index)
+    labels = [column for column in expected.columns if not isinstance(column, int)]
+    assert frame[labels].values.tolist() == expected[labels].values.tolist()
+    np.testing.assert_allclose(frame[[str(year) for year in years]].to_numpy(dtype = float), expected[years].to_numpy(dtype = float), rtol = rtol)
+
+@pytest.mark.parametrize('output_format', ['csv', 'csv.gz'])
+def test_csv(tmp_path, material_flows, emissions, output_format):
+    material_file, emission_file = write(tmp_path, material_flows, emissions, output_format)
+    assert material_file.endswith('material_output' + ('.csv' if output_format == 'csv' else '.csv.gz'))
+    assert_frame(pd.read_csv(material_file, index_col = 0), material_output_frame(material_flows))
+    assert_frame(pd.read_csv(emission_file, index_col = 0), emission_output_frame(emissions))
+
+def test_material_frame(material_flows):
+    pd.testing.assert_frame_equal(material_output_frame(material_flows), reference_material_frame(material_flows))
+    np.testing.assert_array_equal(material_output(material_flows).array(), np.array([material_flows['inflow'], material_flows['outflow']]))
+
+def test_csv_blocks(tmp_path, material_flows, emissions):
+    material_file = write(tmp_path, material_flows, emissions, 'csv')[0]
+    reference_file = os.path.join(str(tmp_path), 'reference.csv')
+    reference_material_frame(material_flows).to_csv(reference_file)
+    with open(material_file, 'rb') as f, open(reference_file, 'rb') as g:
+        assert f.read() == g.read()
+
+def test_parquet(tmp_path, material_flows, emissions):
+    pyarrow = pytest.importorskip('pyarrow')
+    import pyarrow.parquet
+    material_file, emission_file = write(tmp_path, material_flows, emissions, 'parquet')
+    metadata = pyarrow.parquet.ParquetFile(material_file).metadata
+    assert metadata.num_rows == 2 * len(buildings) * len(materials) * regions
+    assert all(metadata.row_group(number).num_rows <= output.parquet_rows + regions for number in range(0, metadata.num_row_groups))
+    assert_frame(pd.read_parquet(material_file), material_output_frame(material_flows), rtol = 0)
+    assert_frame(pd.read_parquet(emission_file), emission_output_frame(emissions), rtol = 0)
+
+def test_parquet_no_blocks(tmp_path):
+    pytest.importorskip('pyarrow')
+    # an output without blocks writes no file
+    empty = Output('empty', ['flow', 'region', 'year'], {'flow': [], 'region': [1], 'year': years}, {}, None, None)
+    file = str(tmp_path / 'empty.parquet')
+    output.writers['parquet'][1](empty, file)
+    assert not os.path.exists(file)
+
+def test_hdf5(tmp_path, material_flows, emissions):
+    h5py = pytest.importorskip('h5py')
+    material_file, emission_file = write(tmp_path, material_flows, emissions, 'hdf5', 'float32')
+    with h5py.File(material_file, 'r') as f:
+        dataset = f['material_output']
+        assert dataset.dtype == np.float32 and dataset.chunks == (1, 1, 1, regions, len(years))     # one chunk per block
+        np.testing.assert_array_equal(dataset[...], np.array([material_flows['inflow'], material_flows['outflow']], dtype = np.float32))
+        assert [dim.keys()[0] for dim in dataset.dims] == ['flow', 'building', 'material', 'region', 'year']
+        assert [label.decode() for label in dataset.dims[1]['building'][...]] == building_names
+        assert [label.decode() for label in dataset.dims[1]['area'][...]] == [area for building, area in buildings]
+        assert list(dataset.dims[4]['year'][...]) == years
+    with h5py.File(emission_file, 'r') as f:
+        np.testing.assert_array_equal(f['GHG_total'][...], emissions['emission_total'].astype(np.float32))
+
+@pytest.mark.parametrize('library', ['netCDF4', 'h5netcdf.legacyapi'])
+def test_netcdf(tmp_path, material_flows, emissions, monkeypatch, library):
+    monkeypatch.setattr(output, 'netcdf', pytest.importorskip(library))
+    material_file, emission_file = write(tmp_path, material_flows, emissions, 'netcdf')
+    with output.netcdf.Dataset(material_file, 'r') as f:
+        variable = f['material_output']
+        assert list(variable.dimensions) == ['flow', 'building', 'material', 'region', 'year']
+        assert list(variable.chunking()) == [1, 1, 1, regions, len(years)]
+        assert list(f['material'][:]) == materials and list(f['year'][:]) == years
+        assert list(f['type'][:]) == [building for building, area in buildings]
+        np.testing.assert_array_equal(variable[:], np.array([material_flows['inflow'], material_flows['outflow']]))
+    with output.netcdf.Dataset(emission_file, 'r') as f:
+        np.testing.assert_array_equal(f['GHG_total'][:], emissions['emission_total'])
+
+def test_netcdf_xarray(tmp_path, material_flows, emissions):
+    # the labels read back as coordinates
+    xarray = pytest.importorskip('xarray')
+    if output.netcdf is None:
+        pytest.skip('the netcdf output requires netCDF4 (or h5netcdf)')
+    material_file = write(tmp_path, material_flows, emissions, 'netcdf')[0]
+    with xarray.open_dataset(material_file) as dataset:
+        array = dataset['material_output']
+        assert list(array['building'].values) == building_names and list(array['area'].values) == [area for building, area in buildings]
+        np.testing.assert_array_equal(array.values, np.array([material_flows['inflow'], material_flows['outflow']]))
+
+def test_float32_csv(tmp_path, material_flows, emissions):
+    material_file, emission_file = write(tmp_path, material_flows, emissions, 'csv', 'float32')
+    assert_frame(pd.read_csv(emission_file, index_col = 0), emission_output_frame(emissions), rtol = 1e-6)
+
+def test_unknown_format(tmp_path, material_flows):
+    config = make_config(tmp_path, material_output = os.path.join(str(tmp_path), 'material_output.csv'), output_format = ['csv', 'xlsx'])
+    with pytest.raises(ValueError, match = 'unknown output format'):
+        write_material_output(config, material_flows)
+
+def test_output_file():
+    assert output_file('output_material/material_output.csv', '.parquet') == 'output_material/material_output.parquet'
+    assert output_file('output_material/material_output', '.csv.gz') == 'output_material/material_output.csv.gz'
+
+# The end.
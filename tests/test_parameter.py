@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Time-dependent parameters: a Parameter (base values & year changes) broadcasts to the full ... x year array it was made from,
+a constant Parameter without copying, and set() changes the values from a year on.
+
+"""
+
+import numpy as np
+import pytest
+
+from GloBUME.config import years
+from GloBUME.parameter import Parameter
+
+def full_array(base, changes):
+    """The ... x year array of a base & year changes, year by year."""
+    values = np.repeat(np.asarray(base, dtype = float)[..., np.newaxis], len(years), axis = -1)
+    for year in sorted(changes):
+        values[..., years.index(year):] = np.asarray(changes[year])[..., np.newaxis]
+    return values
+
+@pytest.fixture
+def values():
+    return full_array(np.arange(6.0).reshape(2, 3), {2020: np.full((2, 3), 10.0), 2030: [[1, np.nan, 3], [4, 5, 6]]})
+
+def test_from_array(values):
+    parameter = Parameter.from_array(values)
+    assert sorted(parameter.changes) == [2020, 2030] and parameter.shape == (2, 3, len(years))
+    np.testing.assert_array_equal(np.asarray(parameter), values)
+    np.testing.assert_array_equal(parameter.at(2025), np.full((2, 3), 10.0))
+    np.testing.assert_array_equal(parameter[1, 2], values[1, 2])
+
+def test_constant():
+    parameter = Parameter(np.arange(6.0).reshape(2, 3))
+    array = parameter.array()
+    assert array.strides[-1] == 0 and not array.flags.writeable     # a view of the base values
+    np.testing.assert_array_equal(array, full_array(parameter.base, {}))
+
+def test_set(values):
+    parameter = Parameter.from_array(values)
+    changed = parameter.set(2025, 7.0, (0, 1))
+    expected = values.copy()
+    expected[0, 1, years.index(2025):] = 7.0
+    np.testing.assert_array_equal(np.asarray(changed), expected)
+    np.testing.assert_array_equal(np.asarray(parameter), values)   # unchanged
+    np.testing.assert_array_equal(np.asarray(parameter.set(years[0], 0.0)), np.zeros(values.shape))
+
+def test_arithmetic(values):
+    parameter = Parameter.from_array(values)
+    other = np.random.default_rng(0).uniform(0, 1, values.shape)
+    np.testing.assert_array_equal(other * parameter, other * values)
+    np.testing.assert_array_equal(parameter - 1, values - 1)
+    np.testing.assert_array_equal(np.einsum('ryc,rc->ry', np.ones((3, 4, len(years))), parameter[0]), np.einsum('ryc,rc->ry', np.ones((3, 4, len(years))), values[0]))
+
+def test_inputs(inputs):
+    # the lifetimes & material intensities are constant, the emission factors change every 5 years from 2020
+    assert len(inputs['lifetime_shape'].changes) == 0 and len(inputs['material_intensity'].changes) == 0
+    assert min(inputs['emission_primary_per_kg'].changes) >= 2020
+
+# The end.
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Regression of the commercial floor area: the analytic Jacobians of the curves, the fits on synthetic data (the parameters are recovered,
+the weighted fit is at least as good as the SLSQP minimisation of the former scripts) & the parameter files written by fit_all.
+
+"""
+
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import optimize
+
+from GloBUME import regression
+from GloBUME.config import Config
+
+true_parameters = {'Gompertz': [12.0, 4.0, 0.09], 'ExpDec': [10.0, 9.0, 0.05]}
+
+# parameters of curves that reach their maximum (a) within the data, so that they are within the bounds of the fit (a <= max(m2/cap))
+saturated_parameters = {'Gompertz': [12.0, 4.0, 0.5], 'ExpDec': [10.0, 9.0, 0.5]}
+
+def synthetic_data(curve, parameters, noise = 0.0, seed = 0):
+    """Data points of a curve (x up to 60,000 US-$/cap), with a relative noise, the population & GDP per capita."""
+    random = np.random.default_rng(seed)
+    x = np.sort(random.uniform(500, 60000, 80))
+    y = regression.curves[curve][0](*parameters, x)[0] * (1 + noise * random.standard_normal(len(x)))
+    return {'x': x, 'y': y, 'pop': random.uniform(1000, 300000, len(x)), 'gdp': x * random.uniform(1.5, 3, len(x))}
+
+@pytest.mark.parametrize('curve', list(regression.curves))
+def test_jacobian(curve):
+    x = np.linspace(0, 60000, 50)
+    function = regression.curves[curve][0]
+    derivatives = function(*true_parameters[curve], x)[1]
+    for number in range(0, 3):
+        step = np.zeros(3)
+        step[number] = 1e-6 * true_parameters[curve][number]
+        difference = function(*(np.array(true_parameters[curve]) + step), x)[0] - function(*(np.array(true_parameters[curve]) - step), x)[0]
+        np.testing.assert_allclose(derivatives[number], difference / (2 * step[number]), rtol = 1e-6, atol = 1e-9)
+
+@pytest.mark.parametrize('curve', list(regression.curves))
+def test_fit_exact_data(curve):
+    data = synthetic_data(curve, saturated_parameters[curve])
+    np.testing.assert_allclose(regression.fit(curve, data), saturated_parameters[curve], rtol = 1e-6)
+    np.testing.assert_allclose(regression.fit(curve, data, regression.sigma(data, 'services')), saturated_parameters[curve], rtol = 1e-6)
+
+@pytest.mark.parametrize('category', ['services', 'offices'])
+@pytest.mark.parametrize('curve', list(regression.curves))
+def test_fit_noisy_data(curve, category):
+    # the weighted X^2 of the fit is not above the optimum of the SLSQP minimisation of the former scripts
+    data = synthetic_data(curve, true_parameters[curve], 0.1)
+    sigma = regression.sigma(data, category)
+    lower, upper = regression.curve_bounds(curve, data['y'])
+    fitted = regression.fit(curve, data, sigma)
+    assert np.all(fitted >= lower) and np.all(fitted <= upper)
+
+    def chi_squared(parameters):
+        return np.sum(((data['y'] - regression.curves[curve][0](*parameters, data['x'])[0]) / sigma) ** 2)
+
+    slsqp = optimize.minimize(chi_squared, x0 = regression.curves[curve][1], method = 'SLSQP', bounds = list(zip(lower, upper)), options = {'maxiter': 10000, 'ftol': 1e-06, 'eps': 1e-08})
+    assert chi_squared(fitted) <= chi_squared(slsqp.x) * (1 + 1e-9)
+    assert regression.goodness_of_fit(curve, fitted, data, sigma)['X2'] == pytest.approx(chi_squared(fitted))
+
+def test_alpha_bound():
+    # the upper bound of a is the maximum of the data (times alpha_fact)
+    data = synthetic_data('Gompertz', [30.0, 4.0, 0.01])
+    assert regression.fit('Gompertz', data)[0] == pytest.approx(np.max(data['y']))
+    assert regression.fit('Gompertz', data, alpha_fact = 1.1)[0] == pytest.approx(1.1 * np.max(data['y']))
+
+def test_fit_all(tmp_path):
+    for number, category in enumerate(regression.categories):
+        data = synthetic_data('Gompertz', true_parameters['Gompertz'], 0.05, seed = number)
+        np.savetxt(str(tmp_path / ('data_' + category + '_PPP.csv')), np.stack([data['x'], data['y'], data['pop'], data['gdp']], axis = 1), delimiter = ',')
+    config = Config()
+    parameters, fits = regression.fit_all(config, folder = str(tmp_path))
+    assert len(fits) == 4 * len(regression.categories) + 2
+    for name in ['Gompertz', 'Gompertz_alpha', 'ExpDec']:
+        assert list(parameters[name].columns) == list(regression.categories.values()) and not parameters[name].isnull().any().any()
+    pd.testing.assert_frame_equal(parameters['Gompertz_alpha'].iloc[:, 1:], parameters['Gompertz'].iloc[:, 1:])
+    weighted = fits[(fits['curve'] == 'Gompertz') & (fits['weighting'] == 'weighted')].set_index('category')
+    np.testing.assert_allclose(parameters['Gompertz'].to_numpy(), weighted.loc[list(regression.categories), ['a', 'b', 'c']].to_numpy().T)
+    # the parameter files read back in the layout of the model inputs
+    regression.write_parameters(config, parameters, str(tmp_path))
+    written = pd.read_csv(str(tmp_path / 'Gompertz_parameters.csv'), index_col = 0)
+    np.testing.assert_allclose(written.to_numpy(), parameters['Gompertz'].to_numpy())
+    assert list(written.index) == ['a', 'b', 'c'] and os.path.isfile(str(tmp_path / 'ExpDec_parameters.csv'))
+
+def test_missing_data(tmp_path, capsys):
+    # the data files are not part of the repository: fit_all & the command line name the missing files
+    np.savetxt(str(tmp_path / 'data_services_PPP.csv'), np.ones((3, 4)), delimiter = ',')
+    with pytest.raises(FileNotFoundError, match = 'data_offices_PPP.csv'):
+        regression.fit_all(Config(), folder = str(tmp_path))
+    with pytest.raises(SystemExit):
+        regression.main(['--folder', str(tmp_path)])
+    error = capsys.readouterr().err
+    assert 'data_retail_PPP.csv' in error and 'data_services_PPP.csv' not in error
+
+# The end.
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Stage cache: runs with the cache give the results of runs without it, the keys only change for the stages whose inputs changed
+& the least recently used entries are removed beyond the maximum size.
+
+"""
+
+import os
+import numpy as np
+import pytest
+
+from GloBUME.config import buildings
+from GloBUME.model import run
+from GloBUME.parameter import Parameter
+from GloBUME.stage_cache import StageCache, stage_cache, stage_keys
+from GloBUME.sweep import emission_factor_files
+
+from conftest import make_config
+
+@pytest.fixture(scope = 'module')
+def uncached(config, inputs):
+    return run(config, inputs)
+
+def assert_same_results(results, expected):
+    np.testing.assert_array_equal(results['emissions']['emission_total'], expected['emissions']['emission_total'])
+    if results['materials'] is not None:
+        for flow in ['inflow', 'outflow']:
+            np.testing.assert_array_equal(results['materials'][flow], expected['materials'][flow])
+
+def test_cached_run(tmp_path, inputs, uncached):
+    config = make_config(tmp_path, stage_cache = str(tmp_path / 'stage_cache'))
+    assert_same_results(run(config, inputs), uncached)     # all stages computed & stored
+    cache = stage_cache(config)
+    hits = cache.hits
+    results = run(config, inputs)                          # the emissions from the cache
+    assert cache.hits == hits + 1
+    assert results['floor_area'] is None and results['stock'] is None and results['materials'] is None
+    assert_same_results(results, uncached)
+
+def test_other_emission_factors(tmp_path, inputs):
+    folder = str(tmp_path / 'stage_cache')
+    run(make_config(tmp_path, stage_cache = folder), inputs)
+    config = make_config(tmp_path, stage_cache = folder, **emission_factor_files('CO2'))
+    results = run(config)   # only the emissions are computed, from the cached material flows
+    assert results['stock'] is None and results['materials'] is not None
+    assert_same_results(results, run(make_config(tmp_path, **emission_factor_files('CO2'))))
+
+def test_stage_keys(tmp_path, config, inputs):
+    keys = stage_keys(config, inputs)
+    changed = dict(inputs)
+    shape = np.asarray(inputs['lifetime_shape']).copy()
+    shape[8, 3] *= 1.1
+    changed['lifetime_shape'] = Parameter.from_array(shape)
+    changed_keys = stage_keys(config, changed)
+    assert changed_keys['floor_area'] == keys['floor_area']
+    assert [changed_keys['stock'][building] != keys['stock'][building] for building in range(0, len(buildings))] == [building == 8 for building in range(0, len(buildings))]
+    assert changed_keys['materials'] != keys['materials'] and changed_keys['emissions'] != keys['emissions']
+    assert stage_keys(config, inputs) == keys
+    # the stock (& the later stages) also depend on the backend of the dynamic stock model
+    numba_keys = stage_keys(make_config(tmp_path, dsm_backend = 'numba'), inputs)
+    assert numba_keys['floor_area'] == keys['floor_area'] and all(numba_keys['stock'][building] != keys['stock'][building] for building in range(0, len(buildings)))
+
+def test_evict(tmp_path):
+    values = {'values': np.zeros(100)}
+    cache = StageCache(str(tmp_path), 10**6)
+    for number, key in enumerate(['a', 'b', 'c']):
+        cache.put('stage', key, values)
+        os.utime(cache.file('stage', key), (number, number))
+    cache.max_size = 3.5 * os.path.getsize(cache.file('stage', 'a'))  # room for 3 entries
+    cache.get('stage', 'a')             # most recently used
+    cache.put('stage', 'd', values)
+    assert cache.get('stage', 'a') is not None and cache.get('stage', 'd') is not None
+    assert cache.get('stage', 'b') is None
+    cache.put('stage', 'e', {'values': np.zeros(1000)})    # larger than the cache: not stored
+    assert cache.get('stage', 'e') is None
+
+# The end.
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Stock dynamics stage: the dense outflow by cohort (region x year x cohort) of inflow_outflown equals the outflow of the original per-region
+dynamic stock models (DynamicStockModel with the negative inflow correction, negative outflow replaced by 0).
+
+"""
+
+import numpy as np
+import pytest
+
+from dynamic_stock_model import DynamicStockModel as DSM
+from GloBUME.config import buildings, regions, years
+from GloBUME.floor_area import compute_floor_area
+from GloBUME.stock import inflow_outflown, outflow_cohort_frame, compute_stock
+
+length = len(years) # 1721-2060
+
+@pytest.fixture(scope = 'module')
+def lifetimes():
+    # Weibull lifetimes by region & cohort
+    shape = np.add.outer(np.linspace(1.8, 2.2, regions), np.zeros(length))
+    scale = np.add.outer(np.linspace(40, 90, regions), np.linspace(0, 10, length))
+    return shape, scale
+
+def synthetic_stock():
+    # a floor area stock (region x year) that grows & shrinks, so that the negative inflow correction is triggered
+    time = np.arange(0, length)
+    growth = np.maximum(time - 100, 0) ** 1.5
+    return np.multiply.outer(np.linspace(0.5, 3, regions), growth * (1 - 0.4 * (time > 300)))
+
+@pytest.fixture(scope = 'module')
+def floor_area(config, inputs):
+    return compute_floor_area(config, inputs)
+
+def region_stock(shape, scale, stock):
+    """Inflow & outflow by cohort of one region, as in the original model."""
+    DSMforward = DSM(t = np.arange(0, length, 1), s = np.array(stock), lt = {'Type': 'Weibull', 'Shape': np.array(shape), 'Scale': np.array(scale)})
+    out_sc, out_oc, out_i = DSMforward.compute_stock_driven_model(NegativeInflowCorrect = True)
+    out_oc[out_oc < 0] = 0
+    return out_i, out_oc
+
+def assert_region_stocks(shape, scale, stock, inflow, outflow_cohort):
+    for region in range(0, regions):
+        region_inflow, region_outflow_cohort = region_stock(shape[region], scale[region], stock[region])
+        np.testing.assert_allclose(inflow[region], region_inflow, rtol = 1e-8, atol = 1e-8)
+        np.testing.assert_allclose(outflow_cohort[region], region_outflow_cohort, rtol = 1e-8, atol = 1e-8)
+
+def test_inflow_outflown(lifetimes):
+    shape, scale = lifetimes
+    stock = synthetic_stock()
+    inflow, outflow_cohort = inflow_outflown(shape, scale, stock, 0)
+    assert inflow.shape == (regions, length) and outflow_cohort.shape == (regions, length, length)
+    assert np.all(outflow_cohort >= 0) and np.all(inflow[:, 301] == 0) # the stock drops in 2022
+    assert_region_stocks(shape, scale, stock, inflow, outflow_cohort)
+
+@pytest.mark.parametrize('building', [0, 6, 8])
+def test_inflow_outflown_inputs(inputs, floor_area, building):
+    shape, scale = np.asarray(inputs['lifetime_shape'][building]), np.asarray(inputs['lifetime_scale'][building])
+    inflow, outflow_cohort = inflow_outflown(shape, scale, floor_area['m2'][building], 0)
+    assert_region_stocks(shape, scale, floor_area['m2'][building], inflow, outflow_cohort)
+
+def test_outflow_cohort_frame(lifetimes):
+    outflow_cohort = inflow_outflown(lifetimes[0], lifetimes[1], synthetic_stock(), 0)[1]
+    frame = outflow_cohort_frame(outflow_cohort, 20)
+    assert list(frame.index) == years and list(frame.columns) == years
+    np.testing.assert_array_equal(frame.values, outflow_cohort[19])
+
+def test_compute_stock(config, inputs, floor_area):
+    stock = compute_stock(config, inputs, floor_area)
+    assert stock['inflow'].shape == (len(buildings), regions, length)
+    assert stock['outflow_cohort'].shape == (len(buildings), regions, length, length)
+    assert np.all(stock['outflow_cohort'] >= 0)
+    assert np.all(np.triu(stock['outflow_cohort'], 1) == 0)   # no outflow of future age-cohorts
+
+# The end.
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+Scenario sweep: the grid gives all combinations of the options, and the scenarios of a sweep (in this process & on a pool of processes)
+give the same emissions as single runs of the same settings.
+
+"""
+
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+from GloBUME.model import run
+from GloBUME.sweep import scenario_grid, emission_factor_files, sweep
+
+from conftest import make_config
+
+def test_scenario_grid():
+    scenarios = scenario_grid({'flag_ExpDec': [0, 1], 'recovery_rate': ['files_recovery_rate/recovery_rate.csv'], 'emission_factor': {'GHG': emission_factor_files('GHG'), 'CO2': emission_factor_files('CO2')}})
+    assert [key for key, settings in scenarios] == ['flag_ExpDec=0,recovery_rate=recovery_rate,emission_factor=GHG', 'flag_ExpDec=0,recovery_rate=recovery_rate,emission_factor=CO2',
+                                                    'flag_ExpDec=1,recovery_rate=recovery_rate,emission_factor=GHG', 'flag_ExpDec=1,recovery_rate=recovery_rate,emission_factor=CO2']
+    assert scenarios[1][1] == {'flag_ExpDec': 0, 'recovery_rate': 'files_recovery_rate/recovery_rate.csv', 'emission_primary': 'files_emission_factor/CO2_primary_per_kg.csv',
+                               'emission_secondary': 'files_emission_factor/CO2_secondary_per_kg.csv'}
+
+@pytest.fixture(scope = 'module')
+def single_runs(tmp_path_factory, inputs):
+    """The total emissions of single runs with flag_ExpDec = 0 & 1."""
+    folder = tmp_path_factory.mktemp('single')
+    return [run(make_config(folder, flag_ExpDec = flag_ExpDec), inputs)['emissions']['emission_total'] for flag_ExpDec in [0, 1]]
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_sweep(tmp_path, capsys, config, single_runs, processes):
+    output = os.path.join(str(tmp_path), 'output_sweep')
+    results = sweep({'flag_ExpDec': [0, 1]}, output, {'input_cache': config.input_cache, 'material_output': None}, processes)
+    assert capsys.readouterr().out == ''     # the progress is only reported with verbose = True
+    assert list(results) == ['flag_ExpDec=0', 'flag_ExpDec=1']
+    for key, expected in zip(results, single_runs):
+        np.testing.assert_array_equal(results[key], expected)
+        written = pd.read_csv(os.path.join(output, key, 'GHG_total.csv'), index_col = 0)
+        np.testing.assert_allclose(written.to_numpy(), expected, rtol = 1e-12)
+    assert list(pd.read_csv(os.path.join(output, 'scenarios.csv'))['key']) == list(results)
+
+def test_verbose(tmp_path, capsys, config):
+    sweep({'flag_ExpDec': [0]}, str(tmp_path), {'input_cache': config.input_cache, 'material_output': None}, 1, verbose = True)
+    assert capsys.readouterr().out.startswith('flag_ExpDec=0 done in')
+
+# The end.